@@ -1,21 +1,23 @@
 import re
-import tkinter as tk
-from tkinter import filedialog, font
-from tkinter import ttk
-import requests
-from packaging import version
+import argparse
+import glob
+import sys
 from openpyxl import load_workbook
 import os
 from pathlib import Path
-import threading
 import time
-
-# Auto-update configuration
-CURRENT_VERSION = "v0422"
-VERSION_FILE = r"\\wectinfo02\pp00\yplu\version.txt"
-
-def get_update_url(latest_version):
-    return f"file://wectinfo02/pp00/yplu/Booking_{latest_version}.7z"
+import csv
+import json
+import zipfile
+import posixpath
+import xml.etree.ElementTree as ET
+import multiprocessing
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+from openpyxl.formula.translate import Translator
+from openpyxl.styles.numbers import builtin_format_code, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import from_excel, from_ISO8601, WINDOWS_EPOCH, CALENDAR_MAC_1904
 
 # 原始 key(lower) -> mapped title
 MAPPING = {
@@ -63,378 +65,523 @@ MAPPED_TITLES = [
 MR_PATTERN = re.compile(r'^(mr11\s*\(0\)|mr12\s*\(1\))$', re.IGNORECASE)
 # BE_TIME 或 SE_TIME 的擷取模式
 TIMEOUT_PATTERN = re.compile(r'^(?:BE_TIME|SE_TIME)\s*\(\s*(\d+)\s*\)$', re.IGNORECASE)
+# 註解內每一行 key = value
+ENTRY_PATTERN = re.compile(r'^(\w+)\s*=\s*(.+)$')
+# 同一則註解文字只解析一次；最多記住幾則不同的註解
+COMMENT_CACHE_SIZE = 4096
+
+@lru_cache(maxsize=COMMENT_CACHE_SIZE)
+def map_comment(text: str) -> tuple:
+    """解析一則 MSS 註解，回傳依序要寫入的 (標題, 值)；同一標題後寫入的覆蓋先前的
+
+    同一個測試條件的註解常重複出現在上百列，結果以 LRU 快取，相同文字只解析一次。
+    """
+    if not text.strip():
+        return ()
 
-class TooltipBase:
-    def __init__(self, widget, text, delay=500, **kwargs):
-        self.widget = widget
-        self.text = text
-        self.delay = delay
-        
-        self.tooltip = None
-        self.id = None
-        
-        self.style_kwargs = {
-            'bg': '#2a2a2a',
-            'fg': '#e0e0e0',
-            'padx': 10,
-            'pady': 5,
-            'bd': 0,
-            'relief': 'solid'
-        }
-        self.style_kwargs.update(kwargs)
-        
-        self.widget.bind("<Enter>", self.schedule)
-        self.widget.bind("<Leave>", self.hide)
-        self.widget.bind("<Button-1>", self.hide)
-    
-    def schedule(self, event=None):
-        self.id = self.widget.after(self.delay, self.show)
-    
-    def show(self, event=None):
-        self.hide()
-        
-        x, y, _, _ = self.widget.bbox("insert")
-        x += self.widget.winfo_rootx() + 25
-        y += self.widget.winfo_rooty() + 25
-        
-        self.tooltip = tk.Toplevel(self.widget)
-        self.tooltip.wm_overrideredirect(True)
-        self.tooltip.wm_geometry(f"+{x}+{y}")
-        
-        label = tk.Label(self.tooltip, text=self.text, justify='left', **self.style_kwargs)
-        label.pack()
-    
-    def hide(self, event=None):
-        if self.id:
-            self.widget.after_cancel(self.id)
-            self.id = None
-        
-        if self.tooltip:
-            self.tooltip.destroy()
-            self.tooltip = None
-
-class MacOSButton(tk.Canvas):
-    def __init__(self, master, text="", command=None, width=200, height=34, corner_radius=6, 
-                 bg='#333333', fg='#ffffff', hover_color='#404040', **kwargs):
-        super().__init__(master, width=width, height=height, bg=bg, bd=0, 
-                         highlightthickness=0, relief="ridge", **kwargs)
-        
-        self.command = command
-        self.corner_radius = corner_radius
-        self.bg = bg
-        self.fg = fg
-        self.hover_color = hover_color
-        self.configure(cursor="hand2")
-        
-        # Initial button state
-        self.button_state = "normal"
-        
-        # Draw the rounded rectangle button
-        self.rect = self.create_rounded_rect(0, 0, width, height, corner_radius, fill=bg, outline="")
-        self.text_id = self.create_text(width/2, height/2, text=text, fill=fg, font=("SF Pro Text", 12))
-        
-        # Bind events
-        self.bind("<Enter>", self.on_enter)
-        self.bind("<Leave>", self.on_leave)
-        self.bind("<ButtonPress-1>", self.on_press)
-        self.bind("<ButtonRelease-1>", self.on_release)
-
-    def create_rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
-        points = [
-            x1+radius, y1,
-            x1+radius, y1,
-            x2-radius, y1,
-            x2-radius, y1,
-            x2, y1,
-            x2, y1+radius,
-            x2, y1+radius,
-            x2, y2-radius,
-            x2, y2-radius,
-            x2, y2,
-            x2-radius, y2,
-            x2-radius, y2,
-            x1+radius, y2,
-            x1+radius, y2,
-            x1, y2,
-            x1, y2-radius,
-            x1, y2-radius,
-            x1, y1+radius,
-            x1, y1+radius,
-            x1, y1
-        ]
-        return self.create_polygon(points, **kwargs, smooth=True)
-
-    def on_enter(self, e):
-        self.itemconfig(self.rect, fill=self.hover_color)
-
-    def on_leave(self, e):
-        self.itemconfig(self.rect, fill=self.bg)
-
-    def on_press(self, e):
-        self.itemconfig(self.rect, fill="#555555")  # Darker when pressed
-
-    def on_release(self, e):
-        self.itemconfig(self.rect, fill=self.hover_color)
-        if self.command:
-            self.command()
-
-class ProgressDialog(tk.Toplevel):
-    def __init__(self, parent, title="處理中"):
-        super().__init__(parent)
-        self.title(title)
-        self.configure(bg="#2a2a2a")
-        self.resizable(False, False)
-        self.transient(parent)
-        self.grab_set()
-        
-        # Calculate position to center on parent
-        parent_x = parent.winfo_rootx()
-        parent_y = parent.winfo_rooty()
-        parent_width = parent.winfo_width()
-        parent_height = parent.winfo_height()
-        
-        width = 300
-        height = 80
-        x = parent_x + (parent_width - width) // 2
-        y = parent_y + (parent_height - height) // 2
-        
-        self.geometry(f"{width}x{height}+{x}+{y}")
-        
-        self.label = tk.Label(self, text="正在處理檔案...", bg="#2a2a2a", fg="#ffffff", font=("SF Pro Text", 12))
-        self.label.pack(pady=(10, 0))
-        
-        self.progress = ttk.Progressbar(self, orient="horizontal", mode="indeterminate", length=250)
-        self.progress.pack(pady=15, padx=25)
-        self.progress.start(10)
-        
-    def update_status(self, text):
-        self.label.config(text=text)
-        self.update()
-
-class MacOSAlert(tk.Toplevel):
-    def __init__(self, parent, title, message, icon_type="info"):
-        super().__init__(parent)
-        self.title("")
-        self.configure(bg="#2a2a2a")
-        self.resizable(False, False)
-        self.transient(parent)
-        
-        # No window decorations on macOS-style dialogs
-        self.overrideredirect(True)
-        
-        # Calculate position to center on parent
-        parent_x = parent.winfo_rootx()
-        parent_y = parent.winfo_rooty()
-        parent_width = parent.winfo_width()
-        parent_height = parent.winfo_height()
-        
-        width = 400
-        height = 170
-        x = parent_x + (parent_width - width) // 2
-        y = parent_y + (parent_height - height) // 2
-        
-        self.geometry(f"{width}x{height}+{x}+{y}")
-        
-        # Add drop shadow effect (simulated with a frame)
-        shadow_frame = tk.Frame(self, bg="#1a1a1a", bd=0)
-        shadow_frame.place(x=3, y=3, width=width, height=height)
-        
-        # Main content frame
-        main_frame = tk.Frame(self, bg="#2a2a2a", bd=0)
-        main_frame.place(x=0, y=0, width=width, height=height)
-        
-        # Icon and title frame
-        header_frame = tk.Frame(main_frame, bg="#2a2a2a", height=40)
-        header_frame.pack(fill=tk.X, pady=(15, 5))
-        
-        # Icon (represented as text for simplicity)
-        if icon_type == "info":
-            icon_text = "ℹ️"
-        elif icon_type == "warning":
-            icon_text = "⚠️"
-        elif icon_type == "error":
-            icon_text = "❌"
+    entries = []
+    for ln in text.splitlines()[1:]:
+        ln = ln.strip()
+        m = ENTRY_PATTERN.match(ln)
+        if m:
+            entries.append((m.group(1).lower(), m.group(2).strip()))
+
+    keys_low = {k for k, _ in entries}
+    # RC override 條件
+    override_rc = None
+    if 'rc' in keys_low:
+        if any(k.startswith('twp') for k in keys_low):
+            override_rc = 'Pulse'
+        elif 'pulse' in keys_low:
+            override_rc = 'tWC'
+
+    resolved = []
+    for key_low, val in entries:
+        # 規則：BE_TIME / SE_TIME 轉為 tout
+        if key_low == 'spec':
+            tm = TIMEOUT_PATTERN.match(val)
+            if tm:
+                mapped = 'Time_out'
+                val = tm.group(1)  # 擷取括號內數字
+            else:
+                mapped = MAPPING.get(key_low)
+        # MR Ratio 專用：只 accept MR11(0) / MR12(1)
+        elif key_low in {'mr_flag', 'flag', 'flag1', 'flag2'}:
+            if not MR_PATTERN.match(val):
+                continue
+            mapped = MAPPING.get(key_low)
+            val = val.upper().replace('MR11(', 'MR11 (').replace('MR12(', 'MR12 (')
+        # RC override
+        elif key_low == 'rc' and override_rc:
+            mapped = override_rc
         else:
-            icon_text = "ℹ️"
-            
-        icon_label = tk.Label(header_frame, text=icon_text, bg="#2a2a2a", fg="#ffffff", font=("SF Pro Text", 24))
-        icon_label.pack(side=tk.LEFT, padx=(20, 0))
-        
-        # Title
-        title_label = tk.Label(header_frame, text=title, bg="#2a2a2a", fg="#ffffff", font=("SF Pro Text", 16, "bold"))
-        title_label.pack(side=tk.LEFT, padx=10)
-        
-        # Message
-        message_frame = tk.Frame(main_frame, bg="#2a2a2a")
-        message_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=5)
-        
-        message_label = tk.Label(message_frame, text=message, bg="#2a2a2a", fg="#e0e0e0", 
-                                font=("SF Pro Text", 12), wraplength=360, justify="left")
-        message_label.pack(fill=tk.BOTH, expand=True)
-        
-        # Button frame
-        button_frame = tk.Frame(main_frame, bg="#2a2a2a", height=50)
-        button_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        self.ok_button = MacOSButton(button_frame, text="確定", command=self.destroy, 
-                                    width=80, height=30, bg="#0066cc", hover_color="#0077ee")
-        self.ok_button.pack(side=tk.RIGHT, padx=(0, 20))
-        
-        # Make dialog modal
-        self.grab_set()
-        self.focus_set()
-        
-        # Position the window in the center of the parent
-        self.update_idletasks()
-        
-        # Add a subtle bounce animation
-        self.animate_entrance()
-        
-        # Bind Escape key to close
-        self.bind("<Escape>", lambda e: self.destroy())
-        
-    def animate_entrance(self):
-        # Store original position
-        orig_y = self.winfo_y()
-        
-        # Start slightly above
-        self.geometry(f"+{self.winfo_x()}+{orig_y-15}")
-        self.update_idletasks()
-        
-        # Bounce down
-        def bounce_down():
-            for i in range(15):
-                self.geometry(f"+{self.winfo_x()}+{self.winfo_y()+1}")
-                self.update_idletasks()
-                time.sleep(0.01)
-        
-        threading.Thread(target=bounce_down, daemon=True).start()
-
-
-class UpdateDialog(tk.Toplevel):
-    def __init__(self, parent):
-        super().__init__(parent)
-        self.title("版本更新工具")
-        self.geometry("400x200")
-        self.resizable(False, False)
-        self.transient(parent)
-        self.style = ttk.Style(self)
-        self.style.theme_use("clam")
-        self.create_widgets()
-
-    def create_widgets(self):
-        self.status_label = ttk.Label(self, text="等待檢查更新...", font=("Arial", 12))
-        self.status_label.pack(pady=20)
-
-        self.progress = ttk.Progressbar(self, orient="horizontal", length=300, mode="determinate")
-        self.progress.pack(pady=10)
-
-        self.check_button = ttk.Button(self, text="檢查更新", command=self.start_update_check)
-        self.check_button.pack(pady=10)
-
-    def update_status(self, message):
-        self.status_label.config(text=message)
-
-    def start_update_check(self):
-        self.check_button.config(state="disabled")
-        self.progress["value"] = 0
-        threading.Thread(target=self.check_for_update, daemon=True).start()
-
-    def check_for_update(self):
-        try:
-            with open(VERSION_FILE, "r") as file:
-                latest_version = file.read().strip()
-            if version.parse(latest_version) > version.parse(CURRENT_VERSION):
-                self.safe_update_status(f"發現新版本：{latest_version}")
-                self.download_update(latest_version)
-            else:
-                self.safe_update_status("目前已是最新版本")
-                self.safe_enable_button()
-        except Exception as e:
-            self.safe_update_status(f"檢查更新失敗：{e}")
-            self.safe_enable_button()
-
-    def download_update(self, latest_version):
-        self.safe_update_status("開始下載更新...")
-        update_url = get_update_url(latest_version)
-        update_path = f"Booking_{latest_version}.7z"
-        if update_url.startswith("file://"):
-            local_path = update_url.replace("file://", r"\\")
-            try:
-                total_size = os.path.getsize(local_path)
-                self.safe_set_progress_max(total_size)
-                with open(local_path, "rb") as src, open(update_path, "wb") as dst:
-                    chunk_size = 1024 * 10
-                    bytes_copied = 0
-                    while True:
-                        chunk = src.read(chunk_size)
-                        if not chunk:
-                            break
-                        dst.write(chunk)
-                        bytes_copied += len(chunk)
-                        self.safe_update_progress(bytes_copied)
-                self.safe_update_status("下載完成，請進行安裝")
-            except Exception as e:
-                self.safe_update_status(f"本機複製更新失敗：{e}")
-        else:
-            try:
-                response = requests.get(update_url, stream=True)
-                total_size = int(response.headers.get("Content-Length", 0))
-                if total_size:
-                    self.safe_set_progress_max(total_size)
-                else:
-                    self.progress.config(mode="indeterminate")
-                    self.safe_update_status("下載進度未知，開始下載...")
-                    self.progress.start(10)
-                with open(update_path, "wb") as f:
-                    bytes_downloaded = 0
-                    chunk_size = 1024 * 10
-                    for chunk in response.iter_content(chunk_size=chunk_size):
-                        if chunk:
-                            f.write(chunk)
-                            bytes_downloaded += len(chunk)
-                            if total_size:
-                                self.safe_update_progress(bytes_downloaded)
-                if not total_size:
-                    self.progress.stop()
-                self.safe_update_status("下載完成，請進行安裝")
-            except Exception as e:
-                self.safe_update_status(f"網路下載更新失敗：{e}")
-        self.safe_enable_button()
-
-    def safe_update_status(self, message):
-        self.after(0, lambda: self.update_status(message))
-
-    def safe_update_progress(self, value):
-        self.after(0, lambda: self.progress.config(value=value))
-
-    def safe_set_progress_max(self, max_value):
-        self.after(0, lambda: self.progress.config(maximum=max_value))
-
-    def safe_enable_button(self):
-        self.after(0, lambda: self.check_button.config(state="normal"))
+            mapped = MAPPING.get(key_low)
+
+        if not mapped:
+            continue
+
+        resolved.append((mapped, val))
+    return tuple(resolved)
+
+class CommentStats:
+    """map_comment 快取的命中統計；worker process 各自計算後由主 process 加總"""
+
+    def __init__(self, hits=0, misses=0):
+        self.hits = hits
+        self.misses = misses
+
+    @classmethod
+    def since(cls, before):
+        """before 為先前的 map_comment.cache_info()，回傳之後這段期間的統計"""
+        info = map_comment.cache_info()
+        return cls(info.hits - before.hits, info.misses - before.misses)
+
+    def add(self, other):
+        self.hits += other.hits
+        self.misses += other.misses
+
+    @property
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def __str__(self):
+        return f"註解快取命中 {self.hits} 次，未命中 {self.misses} 次 (命中率 {self.hit_rate:.0%})"
+
+def compact_sheet(
+    ws,
+    header_row: int = 1,     # 標題列 (含) 以上一律保留
+    last_col: int = 7        # 保留 A ~ G 欄
+):
+    """刪除 last_col 之後所有欄與 A 欄空白的列，結果等同 delete_blank_rows"""
+    # delete_rows 每呼叫一次就搬動下方所有儲存格，空白列一多就是 O(n²)；
+    # 這裡只走過一次 _cells，直接改寫保留下來的列號。
+    # 註解、樣式、超連結都掛在 cell 物件上，會跟著一起搬。
+    # _cells / _current_row 是 openpyxl 內部的屬性 (3.0 ~ 3.1)，不存在時改用公開 API
+    if not isinstance(getattr(ws, '_cells', None), dict) or not hasattr(ws, '_current_row'):
+        delete_blank_rows(ws, header_row, last_col)
+        return
+    cells = {key: cell for key, cell in ws._cells.items() if key[1] <= last_col}
+    max_row = max((r for r, _ in cells), default=1)
+
+    new_rows = {}
+    target = header_row
+    for r in range(header_row + 1, max_row + 1):
+        cell = cells.get((r, 1))
+        if cell is not None and cell.value:
+            target += 1
+            new_rows[r] = target
+
+    compacted = {}
+    for (r, c), cell in cells.items():
+        if r > header_row:
+            r = new_rows.get(r)
+            if r is None:
+                continue
+            cell.row = r
+        compacted[r, c] = cell
+    ws._cells = compacted
+    ws._current_row = ws.max_row if compacted else 0
+
+def delete_blank_rows(ws, header_row: int = 1, last_col: int = 7):
+    """compact_sheet 原本的做法：delete_cols 後逐列 delete_rows (只用公開 API，空白列多時很慢)"""
+    if ws.max_column > last_col:
+        ws.delete_cols(last_col + 1, ws.max_column - last_col)
+    for r in range(ws.max_row, header_row, -1):
+        if not ws.cell(row=r, column=1).value:
+            ws.delete_rows(r)
+
+# xlsx 內部 XML 的命名空間
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+DOC_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+# 儲存格位址，例如 G12
+CELL_REF_PATTERN = re.compile(r'^([A-Z]+)(\d+)$')
+
+def column_index(letters: str) -> int:
+    index = 0
+    for ch in letters:
+        index = index * 26 + ord(ch) - 64
+    return index
+
+def read_xlsx_rels(archive: zipfile.ZipFile, part: str) -> dict:
+    """讀取 part 的關聯檔，回傳 {rId: (關聯類型, zip 內完整路徑)}"""
+    folder, name = posixpath.split(part)
+    rels_path = posixpath.join(folder, '_rels', name + '.rels')
+    if rels_path not in archive.namelist():
+        return {}
+    rels = {}
+    for rel in ET.fromstring(archive.read(rels_path)).iter(PACKAGE_REL_NS + 'Relationship'):
+        target = rel.get('Target', '')
+        if rel.get('TargetMode') == 'External':
+            continue
+        if target.startswith('/'):
+            path = target.lstrip('/')
+        else:
+            path = posixpath.normpath(posixpath.join(folder, target))
+        rels[rel.get('Id')] = (rel.get('Type', '').rsplit('/', 1)[-1], path)
+    return rels
+
+def rich_text(elem) -> str:
+    """與 openpyxl 相同：只串接 <t> 與 <r><t>，不含注音 <rPh>"""
+    snippets = []
+    t = elem.find(SHEET_NS + 't')
+    if t is not None and t.text:
+        snippets.append(t.text)
+    for r in elem.iterfind(SHEET_NS + 'r'):
+        t = r.find(SHEET_NS + 't')
+        if t is not None and t.text:
+            snippets.append(t.text)
+    return ''.join(snippets)
+
+def read_shared_strings(archive: zipfile.ZipFile, path: str) -> list:
+    strings = []
+    with archive.open(path) as fh:
+        for _, elem in ET.iterparse(fh):
+            if elem.tag == SHEET_NS + 'si':
+                strings.append(rich_text(elem).replace('x005F_', ''))
+                elem.clear()
+    return strings
+
+def read_column_comments(archive: zipfile.ZipFile, path: str, column: int) -> dict:
+    """回傳 {列號: 註解文字}，只保留指定欄的註解"""
+    comments = {}
+    with archive.open(path) as fh:
+        for _, elem in ET.iterparse(fh):
+            if elem.tag != SHEET_NS + 'comment':
+                continue
+            m = CELL_REF_PATTERN.match(elem.get('ref', ''))
+            if m and column_index(m.group(1)) == column:
+                text = elem.find(SHEET_NS + 'text')
+                comments[int(m.group(2))] = rich_text(text) if text is not None else ''
+            elem.clear()
+    return comments
+
+def read_date_styles(archive: zipfile.ZipFile, path: str) -> tuple:
+    """回傳 (日期樣式編號, 時間長度樣式編號)；與 openpyxl 相同，這些數值儲存格會轉成 datetime / timedelta"""
+    root = ET.fromstring(archive.read(path))
+    custom = {int(n.get('numFmtId')): n.get('formatCode')
+              for n in root.iter(SHEET_NS + 'numFmt')}
+    date_styles = set()
+    timedelta_styles = set()
+    cell_xfs = root.find(SHEET_NS + 'cellXfs')
+    for idx, xf in enumerate(cell_xfs if cell_xfs is not None else []):
+        num_fmt_id = int(xf.get('numFmtId', 0))
+        fmt = custom.get(num_fmt_id, builtin_format_code(num_fmt_id))
+        if is_date_format(fmt):
+            date_styles.add(idx)
+        if is_timedelta_format(fmt):
+            timedelta_styles.add(idx)
+    return date_styles, timedelta_styles
+
+def read_workbook_parts(archive: zipfile.ZipFile) -> dict:
+    """找出活頁簿內的工作表 [(名稱, 路徑)]、sharedStrings / styles 路徑與日期基準"""
+    workbook_path = 'xl/workbook.xml'
+    for rel_type, path in read_xlsx_rels(archive, '').values():
+        if rel_type == 'officeDocument':
+            workbook_path = path
+    workbook_rels = read_xlsx_rels(archive, workbook_path)
+    parts = {'sheets': [], 'sharedStrings': None, 'styles': None, 'epoch': WINDOWS_EPOCH}
+    for rel_type, path in workbook_rels.values():
+        if rel_type in ('sharedStrings', 'styles'):
+            parts[rel_type] = path
+
+    workbook = ET.fromstring(archive.read(workbook_path))
+    pr = workbook.find(SHEET_NS + 'workbookPr')
+    if pr is not None and pr.get('date1904') in ('1', 'true'):
+        parts['epoch'] = CALENDAR_MAC_1904
+    for sheet in workbook.iter(SHEET_NS + 'sheet'):
+        rel_type, path = workbook_rels.get(sheet.get(DOC_REL_NS + 'id'), (None, None))
+        if rel_type == 'worksheet':
+            parts['sheets'].append((sheet.get('name'), path))
+    return parts
+
+def worksheet_names(file_path: str) -> list:
+    with zipfile.ZipFile(file_path) as archive:
+        return [name for name, _ in read_workbook_parts(archive)['sheets']]
+
+def read_workbook_context(archive: zipfile.ZipFile) -> dict:
+    """讀取各工作表共用的部分：工作表 [(名稱, 路徑)]、sharedStrings 與 styles (格式同 cell_value)"""
+    parts = read_workbook_parts(archive)
+    shared_strings = read_shared_strings(archive, parts['sharedStrings']) if parts['sharedStrings'] else []
+    date_styles, timedelta_styles = read_date_styles(archive, parts['styles']) if parts['styles'] else (set(), set())
+    return {
+        'sheets': parts['sheets'],
+        'shared_strings': shared_strings,
+        'styles': (date_styles, timedelta_styles, parts['epoch']),
+    }
+
+def cell_value(c, shared_strings: list, styles: tuple, shared_formulae: dict = None):
+    """把 <c> 轉成與 openpyxl load_workbook 相同的值；styles 為 (日期樣式, 時間長度樣式, 日期基準)
+
+    shared_formulae 為同一個工作表的 {si: Translator}，共用公式的後續儲存格依此換成自己位置的公式。
+    """
+    data_type = c.get('t', 'n')
+    f = c.find(SHEET_NS + 'f')
+    if f is not None:
+        formula = '=' + (f.text or '')
+        coordinate = c.get('r')
+        if f.get('t') == 'shared' and shared_formulae is not None and coordinate:
+            si = f.get('si')
+            if si in shared_formulae:
+                return shared_formulae[si].translate_formula(coordinate)
+            if formula != '=':
+                shared_formulae[si] = Translator(formula, coordinate)
+        return formula
+    if data_type == 'inlineStr':
+        inline = c.find(SHEET_NS + 'is')
+        return rich_text(inline) if inline is not None else None
+    value = c.findtext(SHEET_NS + 'v') or None
+    if value is None:
+        return None
+    if data_type == 'n':
+        value = float(value) if any(ch in value for ch in '.Ee') else int(value)
+        date_styles, timedelta_styles, epoch = styles
+        style_id = int(c.get('s') or 0)
+        if style_id in date_styles:
+            try:
+                return from_excel(value, epoch, timedelta=style_id in timedelta_styles)
+            except (OverflowError, ValueError):
+                return '#VALUE!'
+        return value
+    if data_type == 's':
+        return shared_strings[int(value)]
+    if data_type == 'b':
+        return bool(int(value))
+    if data_type == 'd':
+        return from_ISO8601(value)
+    return value
+
+def iter_column_a(archive: zipfile.ZipFile, path: str, shared_strings: list, styles: tuple):
+    """逐列串流工作表 XML，產生 (列號, A 欄值)；處理完的列立即清掉，記憶體用量固定"""
+    row_num = 0
+    value = None
+    col = 0
+    sheet_data = None
+    shared_formulae = {}
+    with archive.open(path) as fh:
+        for event, elem in ET.iterparse(fh, events=('start', 'end')):
+            tag = elem.tag
+            if event == 'start':
+                if tag == SHEET_NS + 'row':
+                    row_num = int(elem.get('r') or row_num + 1)
+                    value = None
+                    col = 0
+                elif tag == SHEET_NS + 'sheetData':
+                    sheet_data = elem
+                continue
+            if tag == SHEET_NS + 'c':
+                m = CELL_REF_PATTERN.match(elem.get('r') or '')
+                col = column_index(m.group(1)) if m else col + 1
+                if col == 1:
+                    value = cell_value(elem, shared_strings, styles, shared_formulae)
+            elif tag == SHEET_NS + 'row':
+                yield row_num, value
+                sheet_data.clear()
+
+def iter_sheet_comments(
+    file_path: str,
+    comment_col: int = 7,    # G 欄為註解來源
+    start_row: int = 3,      # 從第 3 列開始
+    header_row: int = 1,     # 標題列在第 1 列
+    sheets: list = None,     # 只讀這些工作表，預設全部
+    context: dict = None     # 已讀好的 read_workbook_context 結果，預設從檔案讀取
+):
+    """不建立 openpyxl 活頁簿，直接串流 xlsx 內的 XML
+
+    產生 (工作表, 列號, A 欄值, 註解文字)；列號是 compact_sheet 刪除 A 欄空白行後的列號，
+    與 extract_comments_all_sheets 寫入的列相同。沒有註解的列，註解文字為空字串。
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        context = read_workbook_context(archive) if context is None else context
+        shared_strings = context['shared_strings']
+        styles = context['styles']
+
+        for name, sheet_path in context['sheets']:
+            if sheets is not None and name not in sheets:
+                continue
+            comments = {}
+            for rel_type, path in read_xlsx_rels(archive, sheet_path).values():
+                if rel_type == 'comments':
+                    comments.update(read_column_comments(archive, path, comment_col))
+
+            # 與 compact_sheet 相同：標題列以上保留原列號，之後只留 A 欄有值的列並往上補齊
+            expected = start_row
+            target = header_row
+            for row, value in iter_column_a(archive, sheet_path, shared_strings, styles):
+                if row <= header_row:
+                    new_row = row
+                elif value:
+                    target += 1
+                    new_row = target
+                else:
+                    continue
+                if new_row < expected:
+                    continue
+                if new_row > expected or not value:
+                    break
+                yield name, new_row, value, comments.get(row, '')
+                expected += 1
+
+# worker process 內由 init_sheet_worker 設定：{活頁簿路徑: read_workbook_context 的結果}
+WORKER_CONTEXT = {}
+
+def init_sheet_worker(file_path: str, context: dict):
+    WORKER_CONTEXT[file_path] = context
+
+def map_sheet(
+    file_path: str,
+    sheet: str,
+    comment_col: int = 7,
+    start_row: int = 3,
+    header_row: int = 1
+) -> tuple:
+    """在 worker process 內解析一個工作表：回傳 ([(列號, A 欄值, 註解文字, map_comment 結果)], CommentStats)"""
+    before = map_comment.cache_info()
+    context = WORKER_CONTEXT.get(file_path)
+    rows = [(row, key, text, map_comment(text) if text.strip() else ())
+            for _, row, key, text in iter_sheet_comments(file_path, comment_col, start_row, header_row, [sheet], context)]
+    return rows, CommentStats.since(before)
+
+def sheet_pool(file_path: str, jobs: int) -> tuple:
+    """建立解析工作表用的 process pool；回傳 (pool, 工作表名稱)
+
+    sharedStrings 與樣式只在這裡讀一次並交給每個 worker，不會每個工作表重讀一次。
+    """
+    with zipfile.ZipFile(file_path) as archive:
+        context = read_workbook_context(archive)
+    pool = ProcessPoolExecutor(max_workers=jobs, initializer=init_sheet_worker, initargs=(file_path, context))
+    return pool, [name for name, _ in context['sheets']]
+
+def iter_mapped_sheets(file_path, comment_col=7, start_row=3, header_row=1, jobs=1, sheets=None):
+    """依工作表順序產生 (工作表, 資料列, CommentStats)，資料列格式同 map_sheet
+
+    jobs > 1 時每個工作表交給 process pool 解析，最多 jobs * 2 個工作表同時在解析中，
+    結果仍依原本順序交回。
+    """
+    sheets = worksheet_names(file_path) if sheets is None else sheets
+    if jobs <= 1 or len(sheets) <= 1:
+        # 單一 process：整本活頁簿只讀一次 sharedStrings
+        current, rows = None, []
+        before = map_comment.cache_info()
+        for sheet, row, key, text in iter_sheet_comments(file_path, comment_col, start_row, header_row, sheets):
+            if sheet != current:
+                if current is not None:
+                    yield current, rows, CommentStats.since(before)
+                    before = map_comment.cache_info()
+                current, rows = sheet, []
+            rows.append((row, key, text, map_comment(text) if text.strip() else ()))
+        if current is not None:
+            yield current, rows, CommentStats.since(before)
+        return
+
+    pool, _ = sheet_pool(file_path, jobs)
+    with pool:
+        in_flight = deque()
+        pending = iter(sheets)
+        while True:
+            while len(in_flight) < jobs * 2:
+                sheet = next(pending, None)
+                if sheet is None:
+                    break
+                in_flight.append((sheet, pool.submit(map_sheet, file_path, sheet, comment_col, start_row, header_row)))
+            if not in_flight:
+                break
+            sheet, future = in_flight.popleft()
+            yield (sheet,) + future.result()
+
+# 匯出檔的欄位：工作表、列號、A 欄值，接著固定 12 個標題
+EXPORT_HEADERS = ['Sheet', 'Row', 'Key'] + MAPPED_TITLES
+
+def iter_mapped_rows(
+    file_path: str,
+    comment_col: int = 7,
+    start_row: int = 3,
+    header_row: int = 1,
+    jobs: int = 1,           # 同時解析的工作表數 (process)
+    stats: CommentStats = None
+):
+    """產生 (工作表, 列號, A 欄值, 12 個標題的值)，與原地轉換寫入的內容相同，但不開啟也不改寫活頁簿"""
+    for sheet, rows, sheet_stats in iter_mapped_sheets(file_path, comment_col, start_row, header_row, jobs):
+        if stats is not None:
+            stats.add(sheet_stats)
+        for row, key, _, resolved in rows:
+            values = dict.fromkeys(MAPPED_TITLES, '')
+            for mapped, val in resolved:
+                values[mapped] = val
+            yield sheet, row, key, [values[title] for title in MAPPED_TITLES]
+
+def save_mapped_csv(rows, save_path):
+    # utf-8-sig 讓 Excel 直接開啟時中文不會亂碼
+    count = 0
+    with open(save_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(EXPORT_HEADERS)
+        for sheet, row, key, values in rows:
+            writer.writerow([sheet, row, key] + values)
+            count += 1
+    return count
+
+def save_mapped_jsonl(rows, save_path):
+    # 每列一個 JSON 物件，空白欄位寫成 null
+    count = 0
+    with open(save_path, 'w', encoding='utf-8') as f:
+        for sheet, row, key, values in rows:
+            record = dict(zip(EXPORT_HEADERS, [sheet, row, key] + [v or None for v in values]))
+            f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+            count += 1
+    return count
+
+# 副檔名 -> 匯出函式
+MAPPED_EXPORTERS = {
+    '.csv': save_mapped_csv,
+    '.jsonl': save_mapped_jsonl,
+}
+
+def export_mapped_columns(
+    file_path: str,
+    save_path: str,
+    fmt: str = None,         # "csv" / "jsonl"，未指定時依 save_path 副檔名
+    comment_col: int = 7,
+    start_row: int = 3,
+    header_row: int = 1,
+    jobs: int = 1,           # 同時解析的工作表數 (process)
+    stats: CommentStats = None   # 傳入時累計註解快取的命中統計
+) -> int:
+    """把 12 個對應欄位直接寫成 CSV / JSON Lines，原始活頁簿保持不變；回傳寫入筆數"""
+    ext = '.' + fmt.lower().lstrip('.') if fmt else Path(save_path).suffix.lower()
+    if ext not in MAPPED_EXPORTERS:
+        raise ValueError(f"不支援的匯出格式：{ext or save_path}，可用格式：{', '.join(MAPPED_EXPORTERS)}")
+    rows = iter_mapped_rows(file_path, comment_col, start_row, header_row, jobs, stats)
+    return MAPPED_EXPORTERS[ext](rows, save_path)
 
 def extract_comments_all_sheets(
     file_path: str,
     comment_col: int = 7,    # G 欄 (1=A,2=B…,7=G) 為註解來源
     start_row: int = 3,      # 從 G3 開始掃描
-    header_row: int = 1      # 標題列在第 1 列
-):
-    wb = load_workbook(filename=file_path)
-    entry_pattern = re.compile(r'^(\w+)\s*=\s*(.+)$')
+    header_row: int = 1,     # 標題列在第 1 列
+    save_path: str = None,   # 另存新檔，預設覆寫原檔
+    verbose: bool = True,
+    stats: CommentStats = None   # 傳入時累計註解快取的命中統計
+) -> int:
+    """把註解轉成固定 12 欄並儲存；回傳轉換範圍內的列數
+
+    時間主要花在 load_workbook 與儲存，註解本身由 map_comment 快取，所以不分工作表平行處理；
+    只需要 12 個欄位時 export_mapped_columns 快得多。
+    """
+    count = 0
+    stats = CommentStats() if stats is None else stats
+    before = map_comment.cache_info()
+    # .xlsm 保留巨集，否則儲存後 VBA 會消失
+    wb = load_workbook(filename=file_path, keep_vba=Path(file_path).suffix.lower() == '.xlsm')
 
     for sheet in wb.sheetnames:
         ws = wb[sheet]
-        print(f"處理工作表：{sheet}")
+        if verbose:
+            print(f"處理工作表：{sheet}")
 
-        # 刪除 H 欄之後所有欄
-        if ws.max_column >= 8:
-            ws.delete_cols(8, ws.max_column - 7)
-
-        # 刪除 A 欄空白行
-        for r in range(ws.max_row, header_row, -1):
-            if not ws.cell(row=r, column=1).value:
-                ws.delete_rows(r)
+        # 刪除 H 欄之後所有欄、A 欄空白行 (一次重建)
+        compact_sheet(ws, header_row=header_row)
 
         # 重置並寫入固定 12 個標題
         for col in range(comment_col+1, ws.max_column+1):
@@ -450,259 +597,152 @@ def extract_comments_all_sheets(
         while True:
             if not ws.cell(row=row, column=1).value:
                 break
+            count += 1
 
             comment = ws.cell(row=row, column=comment_col).comment
             if not comment or not comment.text.strip():
                 row += 1
                 continue
 
-            entries = []
-            for ln in comment.text.splitlines()[1:]:
-                ln = ln.strip()
-                m = entry_pattern.match(ln)
-                if m:
-                    entries.append((m.group(1).lower(), m.group(2).strip()))
-
-            keys_low = {k for k, _ in entries}
-            # RC override 條件
-            override_rc = None
-            if 'rc' in keys_low:
-                if any(k.startswith('twp') for k in keys_low):
-                    override_rc = 'Pulse'
-                elif 'pulse' in keys_low:
-                    override_rc = 'tWC'
-
-            for key_low, val in entries:
-                # 規則：BE_TIME / SE_TIME 轉為 tout
-                if key_low == 'spec':
-                    tm = TIMEOUT_PATTERN.match(val)
-                    if tm:
-                        mapped = 'Time_out'
-                        val = tm.group(1)  # 擷取括號內數字
-                    else:
-                        mapped = MAPPING.get(key_low)
-                # MR Ratio 專用：只 accept MR11(0) / MR12(1)
-                elif key_low in {'mr_flag', 'flag', 'flag1', 'flag2'}:
-                    if not MR_PATTERN.match(val):
-                        continue
-                    mapped = MAPPING.get(key_low)
-                    val = val.upper().replace('MR11(', 'MR11 (').replace('MR12(', 'MR12 (')
-                # RC override
-                elif key_low == 'rc' and override_rc:
-                    mapped = override_rc
-                else:
-                    mapped = MAPPING.get(key_low)
-
-                if not mapped:
-                    continue
-
+            for mapped, val in map_comment(comment.text):
                 col = header_map[mapped.lower()]
                 ws.cell(row=row, column=col, value=val)
 
             row += 1
 
-    wb.save(file_path)
-    print("所有工作表處理完成並已儲存。")
-
-class MainApplication(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("MSS Transfer 工具")
-        self.configure(bg="#1e1e1e")  # Dark background
-        self.minsize(550, 350)
-        self.geometry("550x350")
-        
-        # Set system font
-        self.system_font = font.nametofont("TkDefaultFont")
-        self.system_font.configure(family="SF Pro Text", size=12)
-        
-        # Setting ttk style
-        self.style = ttk.Style()
-        self.style.theme_use('default')
-        self.style.configure("TProgressbar", thickness=6, background='#0066cc')
-        
-        self.create_widgets()
-        self.center_window()
-        self.current_file = None
-        
-    def create_widgets(self):
-        # Main frame with padding
-        main_frame = tk.Frame(self, bg="#1e1e1e", padx=20, pady=20)
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Header Frame
-        header_frame = tk.Frame(main_frame, bg="#1e1e1e")
-        header_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        # Title with SF Pro Display font
-        title_label = tk.Label(header_frame, text="MSS 資料轉換器", 
-                               font=("SF Pro Display", 18, "bold"), 
-                               bg="#1e1e1e", fg="#ffffff")
-        title_label.pack(side=tk.LEFT)
-        
-        # Information icon with tooltip
-        info_frame = tk.Frame(header_frame, bg="#1e1e1e")
-        info_frame.pack(side=tk.RIGHT, padx=5)
-        
-        info_label = tk.Label(info_frame, text="ⓘ", font=("SF Pro Text", 14), 
-                             bg="#1e1e1e", fg="#4a90e2", cursor="hand2")
-        info_label.pack()
-        
-        # Tooltip for info button
-        tooltip_text = ("作者: PP32 YPLu + AI\n"
-                        "版本: 20250529_00")
-        TooltipBase(info_label, tooltip_text)
-        
-        # Description frame
-        desc_frame = tk.Frame(main_frame, bg="#1e1e1e")
-        desc_frame.pack(fill=tk.X, pady=(0, 20))
-        
-        desc_text = ("MSS 註解轉換 for PE\n"
-                       "• 請確保你的G欄位是MSS註解\n"
-                       "• 自動匯入固定12格PE必填欄位\n"
-                       "• 支援多個測試站點分頁整理")
-        desc_label = tk.Label(desc_frame, text=desc_text, bg="#1e1e1e", fg="#a0a0a0", 
-                             font=("SF Pro Text", 11), justify=tk.LEFT)
-        desc_label.pack(anchor="w")
-        
-        # File selection frame
-        file_frame = tk.Frame(main_frame, bg="#1e1e1e")
-        file_frame.pack(fill=tk.X, pady=10)
-        
-        # File path display with ellipsis for long paths
-        self.file_var = tk.StringVar()
-        self.file_var.set("尚未選擇檔案")
-        
-        file_label = tk.Label(file_frame, text="檔案路徑:", bg="#1e1e1e", fg="#e0e0e0", 
-                             font=("SF Pro Text", 12))
-        file_label.pack(side=tk.LEFT, padx=(0, 5))
-        
-        self.path_label = tk.Label(file_frame, textvariable=self.file_var, bg="#1e1e1e", 
-                                  fg="#cccccc", anchor="w", width=40, font=("SF Pro Text", 12))
-        self.path_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        
-        # Button frame
-        button_frame = tk.Frame(main_frame, bg="#1e1e1e")
-        button_frame.pack(fill=tk.X, pady=20)
-        
-        # Open file button
-        self.open_button = MacOSButton(button_frame, text="選擇 MSS 檔案", command=self.select_file,
-                                      width=150, height=34, bg="#333333", hover_color="#404040")
-        self.open_button.pack(side=tk.LEFT, padx=(0, 10))
-        
-        # Process button
-        self.process_button = MacOSButton(button_frame, text="開始處理", command=self.process_file,
-                                         width=150, height=34, bg="#0066cc", hover_color="#0077ee")
-        self.process_button.pack(side=tk.LEFT)
-        self.process_button.configure(state=tk.DISABLED)  # Initially disabled
-
-        # Update button
-        self.update_button = MacOSButton(button_frame, text="檢查更新", command=self.open_update_dialog,
-                                         width=150, height=34, bg="#666666", hover_color="#777777")
-        self.update_button.pack(side=tk.LEFT, padx=(10, 0))
-        
-        # Status frame at the bottom
-        status_frame = tk.Frame(main_frame, bg="#252525", bd=0, height=30)
-        status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(20, 0))
-        
-        self.status_var = tk.StringVar()
-        self.status_var.set("準備就緒")
-        
-        status_label = tk.Label(status_frame, textvariable=self.status_var, bg="#252525", 
-                               fg="#a0a0a0", anchor="w", padx=10, pady=5, font=("SF Pro Text", 10))
-        status_label.pack(fill=tk.X)
-
-    def center_window(self):
-        """Center the window on the screen"""
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f'{width}x{height}+{x}+{y}')
-    
-    def select_file(self):
-        filepath = filedialog.askopenfilename(
-            title="選擇 Excel 檔案",
-            filetypes=[("Excel 活頁簿", "*.xlsx *.xlsm"), ("所有檔案", "*.*")],
-            initialdir=os.path.expanduser("~/Documents")  # Default to Documents folder
-        )
-        
-        if not filepath:
-            return
-            
-        # Update file path display with ellipsis for long paths
-        if len(filepath) > 40:
-            display_path = filepath[:18] + "..." + filepath[-19:]
+    wb.save(save_path or file_path)
+    stats.add(CommentStats.since(before))
+    if verbose:
+        print("所有工作表處理完成並已儲存。")
+        print(stats)
+    return count
+
+# 批次模式搜尋的活頁簿副檔名
+WORKBOOK_PATTERNS = ["*.xlsx", "*.xlsm"]
+# 批次輸出格式：xlsx 為轉換後的活頁簿 (副檔名與原檔相同)，其餘只匯出 12 個對應欄位
+BATCH_FORMATS = ["xlsx"] + [ext.lstrip('.') for ext in MAPPED_EXPORTERS]
+
+def expand_workbooks(patterns, recursive=False):
+    """把檔案、資料夾或萬用字元展開成活頁簿清單 (保持順序、去除重複，略過 Excel 的 ~$ 暫存檔)"""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found = sorted(p for name in WORKBOOK_PATTERNS
+                           for p in glob.glob(os.path.join(pattern, "**" if recursive else "", name), recursive=recursive))
+        elif glob.has_magic(pattern):
+            found = sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
         else:
-            display_path = filepath
-            
-        self.file_var.set(display_path)
-        self.current_file = filepath
-        
-        # Enable process button
-        self.process_button.configure(state=tk.NORMAL)
-        self.status_var.set(f"已載入: {Path(filepath).name}")
-
-    def process_file_thread(self, filepath, progress_dialog):
-        try:
-            # Update status
-            progress_dialog.update_status("正在處理 MSS 檔案...")
-            
-            # Process the file using the original logic
-            extract_comments_all_sheets(
-                file_path=filepath,
-                comment_col=7,   # G 欄
-                start_row=3,     # 從第 3 列
-                header_row=1
-            )
-            
-            # Close progress dialog
-            progress_dialog.destroy()
-            
-            # Show success message
-            success_message = f"已成功處理檔案：\n{Path(filepath).name}\n\n所有工作表的註解資料已轉換完成。"
-            MacOSAlert(self, "完成", success_message, "info")
-            
-            # Update status
-            self.status_var.set("處理完成")
-            
-        except Exception as e:
-            # Close progress dialog before showing error
-            progress_dialog.destroy()
-            MacOSAlert(self, "錯誤", f"處理檔案時發生錯誤：\n{str(e)}", "error")
-            self.status_var.set("處理時發生錯誤")
-
-    def process_file(self):
-        if not self.current_file:
-            MacOSAlert(self, "注意", "請先選擇一個 Excel 檔案。", "warning")
-            return
-            
-        # Show progress dialog
-        progress_dialog = ProgressDialog(self, "處理中")
-        
-        # Process in a separate thread to keep UI responsive
-        threading.Thread(
-            target=self.process_file_thread,
-            args=(self.current_file, progress_dialog),
-            daemon=True
-        ).start()
-
-    def open_update_dialog(self):
-        UpdateDialog(self)
+            found = [pattern]
+        files.extend(os.path.abspath(p) for p in found if not Path(p).name.startswith("~$"))
+    return list(dict.fromkeys(files))
 
-# Set macOS-style appearance for the application
-def set_macos_appearance():
+def batch_output_paths(files, output_dir, fmt):
+    """每個活頁簿對應輸出資料夾內的一個檔案，同名時加上序號"""
+    paths = []
+    used = set()
+    for filepath in files:
+        suffix = Path(filepath).suffix if fmt == "xlsx" else "." + fmt
+        stem = Path(filepath).stem
+        candidate = Path(output_dir) / f"{stem}{suffix}"
+        n = 1
+        while candidate in used:
+            candidate = Path(output_dir) / f"{stem}_{n}{suffix}"
+            n += 1
+        used.add(candidate)
+        paths.append(str(candidate))
+    return paths
+
+def batch_transfer_file(filepath, save_path, fmt="xlsx", jobs=1):
+    """轉換一個活頁簿並寫到 save_path，原檔不變；回傳 (列數, 秒數, CommentStats)
+
+    jobs 為 csv / jsonl 匯出時同時解析的工作表數，xlsx 不使用。
+    """
+    if os.path.abspath(save_path) == os.path.abspath(filepath):
+        raise ValueError("輸出檔與原檔相同，請指定其他輸出資料夾")
+    start = time.perf_counter()
+    stats = CommentStats()
+    try:
+        if fmt == "xlsx":
+            count = extract_comments_all_sheets(filepath, save_path=save_path, verbose=False, stats=stats)
+        else:
+            count = export_mapped_columns(filepath, save_path, fmt, jobs=jobs, stats=stats)
+    except Exception:
+        # 不留下寫到一半的輸出檔
+        if os.path.exists(save_path):
+            os.remove(save_path)
+        raise
+    return count, time.perf_counter() - start, stats
+
+def run_batch(files, output_dir, fmt="xlsx", jobs=None):
+    """以 process pool 同時轉換多個活頁簿，單一檔案失敗不影響其他檔案；回傳失敗的檔案數
+
+    只有一個檔案且匯出 csv / jsonl 時，改為在 process pool 內平行解析它的各個工作表
+    (xlsx 的時間主要花在載入與儲存活頁簿，平行解析註解沒有幫助)。
+    """
+    failed = 0
+    total = CommentStats()
+    jobs = jobs or os.cpu_count() or 1
+    os.makedirs(output_dir, exist_ok=True)
+
+    workers = min(jobs, len(files))
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    sheet_jobs = jobs if pool is None and fmt != "xlsx" else 1
     try:
-        # For macOS
-        import platform
-        if platform.system() == 'Darwin':
-            os.system('''defaults write -g NSRequiresAquaSystemAppearance -bool YES''')
-            from tkmacosx import ColorVar, ColorscaleVar
-    except:
-        pass
+        # 最多 workers * 2 個檔案在處理中，結果依輸入順序印出
+        in_flight = deque()
+        pending = iter(zip(files, batch_output_paths(files, output_dir, fmt)))
+        while True:
+            while len(in_flight) < (workers * 2 if pool else 1):
+                item = next(pending, None)
+                if item is None:
+                    break
+                filepath, save_path = item
+                future = pool.submit(batch_transfer_file, filepath, save_path, fmt) if pool else None
+                in_flight.append((filepath, save_path, future))
+            if not in_flight:
+                break
+            filepath, save_path, future = in_flight.popleft()
+            try:
+                count, elapsed, stats = future.result() if future else batch_transfer_file(filepath, save_path, fmt, sheet_jobs)
+            except Exception as e:
+                failed += 1
+                print(f"FAIL {filepath}: {e}", file=sys.stderr)
+                continue
+            total.add(stats)
+            print(f"OK   {filepath} -> {save_path} ({count} 列, {elapsed:.2f}s, 註解快取命中率 {stats.hit_rate:.0%})")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    print(f"合計{total}")
+    return failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="MSS 註解轉換工具 (命令列模式，不需要圖形介面)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("batch", help="批次轉換多個 MSS 活頁簿，結果寫到輸出資料夾，原檔不變")
+    p.add_argument("inputs", nargs="+", help=".xlsx / .xlsm 檔、資料夾或萬用字元 (例如 mss/*.xlsx)")
+    p.add_argument("-r", "--recursive", action="store_true", help="資料夾內包含子資料夾")
+    p.add_argument("-o", "--output-dir", required=True, help="輸出資料夾")
+    p.add_argument("-f", "--format", default="xlsx", choices=BATCH_FORMATS,
+                   help="xlsx：轉換後的活頁簿 (預設)；csv / jsonl：只匯出 12 個對應欄位")
+    p.add_argument("-j", "--jobs", type=int, help="同時處理的 process 數 (預設 CPU 核心數)")
+
+    args = parser.parse_args(argv)
+    files = expand_workbooks(args.inputs, args.recursive)
+    if not files:
+        print("找不到任何 .xlsx / .xlsm 檔案", file=sys.stderr)
+        return 2
+    start = time.perf_counter()
+    failed = run_batch(files, args.output_dir, args.format, args.jobs)
+    print(f"完成：成功 {len(files) - failed} 個，失敗 {failed} 個 ({time.perf_counter() - start:.2f}s)")
+    return 1 if failed else 0
 
 if __name__ == '__main__':
-    set_macos_appearance()
-    app = MainApplication()
-    app.mainloop()
\ No newline at end of file
+    multiprocessing.freeze_support()  # 打包成 exe 時 process pool 需要
+    # 有帶參數時走命令列模式 (可在沒有螢幕的 Linux 上執行)
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    # 圖形介面與版本更新需要 tkinter / requests，只在開啟視窗時載入
+    from MSS_transfer_gui import run_gui
+    run_gui()
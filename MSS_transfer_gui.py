@@ -0,0 +1,620 @@
+"""MSS_transfer 的圖形介面與版本更新；命令列的 batch 模式不會載入這個模組 (伺服器上不需要 Tk)"""
+import os
+import threading
+import time
+import multiprocessing
+import tkinter as tk
+from tkinter import filedialog, font
+from tkinter import ttk
+from pathlib import Path
+
+from MSS_transfer import CommentStats, export_mapped_columns, extract_comments_all_sheets
+
+# Auto-update configuration
+CURRENT_VERSION = "v0422"
+VERSION_FILE = r"\\wectinfo02\pp00\yplu\version.txt"
+
+def get_update_url(latest_version):
+    return f"file://wectinfo02/pp00/yplu/Booking_{latest_version}.7z"
+
+class TooltipBase:
+    def __init__(self, widget, text, delay=500, **kwargs):
+        self.widget = widget
+        self.text = text
+        self.delay = delay
+        
+        self.tooltip = None
+        self.id = None
+        
+        self.style_kwargs = {
+            'bg': '#2a2a2a',
+            'fg': '#e0e0e0',
+            'padx': 10,
+            'pady': 5,
+            'bd': 0,
+            'relief': 'solid'
+        }
+        self.style_kwargs.update(kwargs)
+        
+        self.widget.bind("<Enter>", self.schedule)
+        self.widget.bind("<Leave>", self.hide)
+        self.widget.bind("<Button-1>", self.hide)
+    
+    def schedule(self, event=None):
+        self.id = self.widget.after(self.delay, self.show)
+    
+    def show(self, event=None):
+        self.hide()
+        
+        x, y, _, _ = self.widget.bbox("insert")
+        x += self.widget.winfo_rootx() + 25
+        y += self.widget.winfo_rooty() + 25
+        
+        self.tooltip = tk.Toplevel(self.widget)
+        self.tooltip.wm_overrideredirect(True)
+        self.tooltip.wm_geometry(f"+{x}+{y}")
+        
+        label = tk.Label(self.tooltip, text=self.text, justify='left', **self.style_kwargs)
+        label.pack()
+    
+    def hide(self, event=None):
+        if self.id:
+            self.widget.after_cancel(self.id)
+            self.id = None
+        
+        if self.tooltip:
+            self.tooltip.destroy()
+            self.tooltip = None
+
+class MacOSButton(tk.Canvas):
+    def __init__(self, master, text="", command=None, width=200, height=34, corner_radius=6, 
+                 bg='#333333', fg='#ffffff', hover_color='#404040', **kwargs):
+        super().__init__(master, width=width, height=height, bg=bg, bd=0, 
+                         highlightthickness=0, relief="ridge", **kwargs)
+        
+        self.command = command
+        self.corner_radius = corner_radius
+        self.bg = bg
+        self.fg = fg
+        self.hover_color = hover_color
+        self.configure(cursor="hand2")
+        
+        # Initial button state
+        self.button_state = "normal"
+        
+        # Draw the rounded rectangle button
+        self.rect = self.create_rounded_rect(0, 0, width, height, corner_radius, fill=bg, outline="")
+        self.text_id = self.create_text(width/2, height/2, text=text, fill=fg, font=("SF Pro Text", 12))
+        
+        # Bind events
+        self.bind("<Enter>", self.on_enter)
+        self.bind("<Leave>", self.on_leave)
+        self.bind("<ButtonPress-1>", self.on_press)
+        self.bind("<ButtonRelease-1>", self.on_release)
+
+    def create_rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
+        points = [
+            x1+radius, y1,
+            x1+radius, y1,
+            x2-radius, y1,
+            x2-radius, y1,
+            x2, y1,
+            x2, y1+radius,
+            x2, y1+radius,
+            x2, y2-radius,
+            x2, y2-radius,
+            x2, y2,
+            x2-radius, y2,
+            x2-radius, y2,
+            x1+radius, y2,
+            x1+radius, y2,
+            x1, y2,
+            x1, y2-radius,
+            x1, y2-radius,
+            x1, y1+radius,
+            x1, y1+radius,
+            x1, y1
+        ]
+        return self.create_polygon(points, **kwargs, smooth=True)
+
+    def on_enter(self, e):
+        self.itemconfig(self.rect, fill=self.hover_color)
+
+    def on_leave(self, e):
+        self.itemconfig(self.rect, fill=self.bg)
+
+    def on_press(self, e):
+        self.itemconfig(self.rect, fill="#555555")  # Darker when pressed
+
+    def on_release(self, e):
+        self.itemconfig(self.rect, fill=self.hover_color)
+        if self.command:
+            self.command()
+
+class ProgressDialog(tk.Toplevel):
+    def __init__(self, parent, title="處理中"):
+        super().__init__(parent)
+        self.title(title)
+        self.configure(bg="#2a2a2a")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.grab_set()
+        
+        # Calculate position to center on parent
+        parent_x = parent.winfo_rootx()
+        parent_y = parent.winfo_rooty()
+        parent_width = parent.winfo_width()
+        parent_height = parent.winfo_height()
+        
+        width = 300
+        height = 80
+        x = parent_x + (parent_width - width) // 2
+        y = parent_y + (parent_height - height) // 2
+        
+        self.geometry(f"{width}x{height}+{x}+{y}")
+        
+        self.label = tk.Label(self, text="正在處理檔案...", bg="#2a2a2a", fg="#ffffff", font=("SF Pro Text", 12))
+        self.label.pack(pady=(10, 0))
+        
+        self.progress = ttk.Progressbar(self, orient="horizontal", mode="indeterminate", length=250)
+        self.progress.pack(pady=15, padx=25)
+        self.progress.start(10)
+        
+    def update_status(self, text):
+        self.label.config(text=text)
+        self.update()
+
+class MacOSAlert(tk.Toplevel):
+    def __init__(self, parent, title, message, icon_type="info"):
+        super().__init__(parent)
+        self.title("")
+        self.configure(bg="#2a2a2a")
+        self.resizable(False, False)
+        self.transient(parent)
+        
+        # No window decorations on macOS-style dialogs
+        self.overrideredirect(True)
+        
+        # Calculate position to center on parent
+        parent_x = parent.winfo_rootx()
+        parent_y = parent.winfo_rooty()
+        parent_width = parent.winfo_width()
+        parent_height = parent.winfo_height()
+        
+        width = 400
+        height = 170
+        x = parent_x + (parent_width - width) // 2
+        y = parent_y + (parent_height - height) // 2
+        
+        self.geometry(f"{width}x{height}+{x}+{y}")
+        
+        # Add drop shadow effect (simulated with a frame)
+        shadow_frame = tk.Frame(self, bg="#1a1a1a", bd=0)
+        shadow_frame.place(x=3, y=3, width=width, height=height)
+        
+        # Main content frame
+        main_frame = tk.Frame(self, bg="#2a2a2a", bd=0)
+        main_frame.place(x=0, y=0, width=width, height=height)
+        
+        # Icon and title frame
+        header_frame = tk.Frame(main_frame, bg="#2a2a2a", height=40)
+        header_frame.pack(fill=tk.X, pady=(15, 5))
+        
+        # Icon (represented as text for simplicity)
+        if icon_type == "info":
+            icon_text = "ℹ️"
+        elif icon_type == "warning":
+            icon_text = "⚠️"
+        elif icon_type == "error":
+            icon_text = "❌"
+        else:
+            icon_text = "ℹ️"
+            
+        icon_label = tk.Label(header_frame, text=icon_text, bg="#2a2a2a", fg="#ffffff", font=("SF Pro Text", 24))
+        icon_label.pack(side=tk.LEFT, padx=(20, 0))
+        
+        # Title
+        title_label = tk.Label(header_frame, text=title, bg="#2a2a2a", fg="#ffffff", font=("SF Pro Text", 16, "bold"))
+        title_label.pack(side=tk.LEFT, padx=10)
+        
+        # Message
+        message_frame = tk.Frame(main_frame, bg="#2a2a2a")
+        message_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=5)
+        
+        message_label = tk.Label(message_frame, text=message, bg="#2a2a2a", fg="#e0e0e0", 
+                                font=("SF Pro Text", 12), wraplength=360, justify="left")
+        message_label.pack(fill=tk.BOTH, expand=True)
+        
+        # Button frame
+        button_frame = tk.Frame(main_frame, bg="#2a2a2a", height=50)
+        button_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        self.ok_button = MacOSButton(button_frame, text="確定", command=self.destroy, 
+                                    width=80, height=30, bg="#0066cc", hover_color="#0077ee")
+        self.ok_button.pack(side=tk.RIGHT, padx=(0, 20))
+        
+        # Make dialog modal
+        self.grab_set()
+        self.focus_set()
+        
+        # Position the window in the center of the parent
+        self.update_idletasks()
+        
+        # Add a subtle bounce animation
+        self.animate_entrance()
+        
+        # Bind Escape key to close
+        self.bind("<Escape>", lambda e: self.destroy())
+        
+    def animate_entrance(self):
+        # Store original position
+        orig_y = self.winfo_y()
+        
+        # Start slightly above
+        self.geometry(f"+{self.winfo_x()}+{orig_y-15}")
+        self.update_idletasks()
+        
+        # Bounce down
+        def bounce_down():
+            for i in range(15):
+                self.geometry(f"+{self.winfo_x()}+{self.winfo_y()+1}")
+                self.update_idletasks()
+                time.sleep(0.01)
+        
+        threading.Thread(target=bounce_down, daemon=True).start()
+
+
+class UpdateDialog(tk.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("版本更新工具")
+        self.geometry("400x200")
+        self.resizable(False, False)
+        self.transient(parent)
+        self.style = ttk.Style(self)
+        self.style.theme_use("clam")
+        self.create_widgets()
+
+    def create_widgets(self):
+        self.status_label = ttk.Label(self, text="等待檢查更新...", font=("Arial", 12))
+        self.status_label.pack(pady=20)
+
+        self.progress = ttk.Progressbar(self, orient="horizontal", length=300, mode="determinate")
+        self.progress.pack(pady=10)
+
+        self.check_button = ttk.Button(self, text="檢查更新", command=self.start_update_check)
+        self.check_button.pack(pady=10)
+
+    def update_status(self, message):
+        self.status_label.config(text=message)
+
+    def start_update_check(self):
+        self.check_button.config(state="disabled")
+        self.progress["value"] = 0
+        threading.Thread(target=self.check_for_update, daemon=True).start()
+
+    def check_for_update(self):
+        try:
+            from packaging import version
+            with open(VERSION_FILE, "r") as file:
+                latest_version = file.read().strip()
+            if version.parse(latest_version) > version.parse(CURRENT_VERSION):
+                self.safe_update_status(f"發現新版本：{latest_version}")
+                self.download_update(latest_version)
+            else:
+                self.safe_update_status("目前已是最新版本")
+                self.safe_enable_button()
+        except Exception as e:
+            self.safe_update_status(f"檢查更新失敗：{e}")
+            self.safe_enable_button()
+
+    def download_update(self, latest_version):
+        self.safe_update_status("開始下載更新...")
+        update_url = get_update_url(latest_version)
+        update_path = f"Booking_{latest_version}.7z"
+        if update_url.startswith("file://"):
+            local_path = update_url.replace("file://", r"\\")
+            try:
+                total_size = os.path.getsize(local_path)
+                self.safe_set_progress_max(total_size)
+                with open(local_path, "rb") as src, open(update_path, "wb") as dst:
+                    chunk_size = 1024 * 10
+                    bytes_copied = 0
+                    while True:
+                        chunk = src.read(chunk_size)
+                        if not chunk:
+                            break
+                        dst.write(chunk)
+                        bytes_copied += len(chunk)
+                        self.safe_update_progress(bytes_copied)
+                self.safe_update_status("下載完成，請進行安裝")
+            except Exception as e:
+                self.safe_update_status(f"本機複製更新失敗：{e}")
+        else:
+            try:
+                import requests
+                response = requests.get(update_url, stream=True)
+                total_size = int(response.headers.get("Content-Length", 0))
+                if total_size:
+                    self.safe_set_progress_max(total_size)
+                else:
+                    self.progress.config(mode="indeterminate")
+                    self.safe_update_status("下載進度未知，開始下載...")
+                    self.progress.start(10)
+                with open(update_path, "wb") as f:
+                    bytes_downloaded = 0
+                    chunk_size = 1024 * 10
+                    for chunk in response.iter_content(chunk_size=chunk_size):
+                        if chunk:
+                            f.write(chunk)
+                            bytes_downloaded += len(chunk)
+                            if total_size:
+                                self.safe_update_progress(bytes_downloaded)
+                if not total_size:
+                    self.progress.stop()
+                self.safe_update_status("下載完成，請進行安裝")
+            except Exception as e:
+                self.safe_update_status(f"網路下載更新失敗：{e}")
+        self.safe_enable_button()
+
+    def safe_update_status(self, message):
+        self.after(0, lambda: self.update_status(message))
+
+    def safe_update_progress(self, value):
+        self.after(0, lambda: self.progress.config(value=value))
+
+    def safe_set_progress_max(self, max_value):
+        self.after(0, lambda: self.progress.config(maximum=max_value))
+
+    def safe_enable_button(self):
+        self.after(0, lambda: self.check_button.config(state="normal"))
+
+class MainApplication(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("MSS Transfer 工具")
+        self.configure(bg="#1e1e1e")  # Dark background
+        self.minsize(700, 350)
+        self.geometry("700x350")
+        
+        # Set system font
+        self.system_font = font.nametofont("TkDefaultFont")
+        self.system_font.configure(family="SF Pro Text", size=12)
+        
+        # Setting ttk style
+        self.style = ttk.Style()
+        self.style.theme_use('default')
+        self.style.configure("TProgressbar", thickness=6, background='#0066cc')
+        
+        self.create_widgets()
+        self.center_window()
+        self.current_file = None
+        
+    def create_widgets(self):
+        # Main frame with padding
+        main_frame = tk.Frame(self, bg="#1e1e1e", padx=20, pady=20)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Header Frame
+        header_frame = tk.Frame(main_frame, bg="#1e1e1e")
+        header_frame.pack(fill=tk.X, pady=(0, 15))
+        
+        # Title with SF Pro Display font
+        title_label = tk.Label(header_frame, text="MSS 資料轉換器", 
+                               font=("SF Pro Display", 18, "bold"), 
+                               bg="#1e1e1e", fg="#ffffff")
+        title_label.pack(side=tk.LEFT)
+        
+        # Information icon with tooltip
+        info_frame = tk.Frame(header_frame, bg="#1e1e1e")
+        info_frame.pack(side=tk.RIGHT, padx=5)
+        
+        info_label = tk.Label(info_frame, text="ⓘ", font=("SF Pro Text", 14), 
+                             bg="#1e1e1e", fg="#4a90e2", cursor="hand2")
+        info_label.pack()
+        
+        # Tooltip for info button
+        tooltip_text = ("作者: PP32 YPLu + AI\n"
+                        "版本: 20250529_00")
+        TooltipBase(info_label, tooltip_text)
+        
+        # Description frame
+        desc_frame = tk.Frame(main_frame, bg="#1e1e1e")
+        desc_frame.pack(fill=tk.X, pady=(0, 20))
+        
+        desc_text = ("MSS 註解轉換 for PE\n"
+                       "• 請確保你的G欄位是MSS註解\n"
+                       "• 自動匯入固定12格PE必填欄位\n"
+                       "• 支援多個測試站點分頁整理")
+        desc_label = tk.Label(desc_frame, text=desc_text, bg="#1e1e1e", fg="#a0a0a0", 
+                             font=("SF Pro Text", 11), justify=tk.LEFT)
+        desc_label.pack(anchor="w")
+        
+        # File selection frame
+        file_frame = tk.Frame(main_frame, bg="#1e1e1e")
+        file_frame.pack(fill=tk.X, pady=10)
+        
+        # File path display with ellipsis for long paths
+        self.file_var = tk.StringVar()
+        self.file_var.set("尚未選擇檔案")
+        
+        file_label = tk.Label(file_frame, text="檔案路徑:", bg="#1e1e1e", fg="#e0e0e0", 
+                             font=("SF Pro Text", 12))
+        file_label.pack(side=tk.LEFT, padx=(0, 5))
+        
+        self.path_label = tk.Label(file_frame, textvariable=self.file_var, bg="#1e1e1e", 
+                                  fg="#cccccc", anchor="w", width=40, font=("SF Pro Text", 12))
+        self.path_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        
+        # Button frame
+        button_frame = tk.Frame(main_frame, bg="#1e1e1e")
+        button_frame.pack(fill=tk.X, pady=20)
+        
+        # Open file button
+        self.open_button = MacOSButton(button_frame, text="選擇 MSS 檔案", command=self.select_file,
+                                      width=150, height=34, bg="#333333", hover_color="#404040")
+        self.open_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        # Process button
+        self.process_button = MacOSButton(button_frame, text="開始處理", command=self.process_file,
+                                         width=150, height=34, bg="#0066cc", hover_color="#0077ee")
+        self.process_button.pack(side=tk.LEFT)
+        self.process_button.configure(state=tk.DISABLED)  # Initially disabled
+
+        # Export button (CSV / JSON Lines, 不改寫原檔)
+        self.export_button = MacOSButton(button_frame, text="匯出 CSV", command=self.export_file,
+                                        width=150, height=34, bg="#333333", hover_color="#404040")
+        self.export_button.pack(side=tk.LEFT, padx=(10, 0))
+        self.export_button.configure(state=tk.DISABLED)  # Initially disabled
+
+        # Update button
+        self.update_button = MacOSButton(button_frame, text="檢查更新", command=self.open_update_dialog,
+                                         width=150, height=34, bg="#666666", hover_color="#777777")
+        self.update_button.pack(side=tk.LEFT, padx=(10, 0))
+        
+        # Status frame at the bottom
+        status_frame = tk.Frame(main_frame, bg="#252525", bd=0, height=30)
+        status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(20, 0))
+        
+        self.status_var = tk.StringVar()
+        self.status_var.set("準備就緒")
+        
+        status_label = tk.Label(status_frame, textvariable=self.status_var, bg="#252525", 
+                               fg="#a0a0a0", anchor="w", padx=10, pady=5, font=("SF Pro Text", 10))
+        status_label.pack(fill=tk.X)
+
+    def center_window(self):
+        """Center the window on the screen"""
+        self.update_idletasks()
+        width = self.winfo_width()
+        height = self.winfo_height()
+        x = (self.winfo_screenwidth() // 2) - (width // 2)
+        y = (self.winfo_screenheight() // 2) - (height // 2)
+        self.geometry(f'{width}x{height}+{x}+{y}')
+    
+    def select_file(self):
+        filepath = filedialog.askopenfilename(
+            title="選擇 Excel 檔案",
+            filetypes=[("Excel 活頁簿", "*.xlsx *.xlsm"), ("所有檔案", "*.*")],
+            initialdir=os.path.expanduser("~/Documents")  # Default to Documents folder
+        )
+        
+        if not filepath:
+            return
+            
+        # Update file path display with ellipsis for long paths
+        if len(filepath) > 40:
+            display_path = filepath[:18] + "..." + filepath[-19:]
+        else:
+            display_path = filepath
+            
+        self.file_var.set(display_path)
+        self.current_file = filepath
+        
+        # Enable process / export buttons
+        self.process_button.configure(state=tk.NORMAL)
+        self.export_button.configure(state=tk.NORMAL)
+        self.status_var.set(f"已載入: {Path(filepath).name}")
+
+    def process_file_thread(self, filepath, progress_dialog):
+        try:
+            # Update status
+            progress_dialog.update_status("正在處理 MSS 檔案...")
+            
+            # Process the file using the original logic
+            stats = CommentStats()
+            extract_comments_all_sheets(
+                file_path=filepath,
+                comment_col=7,   # G 欄
+                start_row=3,     # 從第 3 列
+                header_row=1,
+                stats=stats
+            )
+            
+            # Close progress dialog
+            progress_dialog.destroy()
+            
+            # Show success message
+            success_message = f"已成功處理檔案：\n{Path(filepath).name}\n\n所有工作表的註解資料已轉換完成。\n{stats}"
+            MacOSAlert(self, "完成", success_message, "info")
+            
+            # Update status
+            self.status_var.set("處理完成")
+            
+        except Exception as e:
+            # Close progress dialog before showing error
+            progress_dialog.destroy()
+            MacOSAlert(self, "錯誤", f"處理檔案時發生錯誤：\n{str(e)}", "error")
+            self.status_var.set("處理時發生錯誤")
+
+    def process_file(self):
+        if not self.current_file:
+            MacOSAlert(self, "注意", "請先選擇一個 Excel 檔案。", "warning")
+            return
+            
+        # Show progress dialog
+        progress_dialog = ProgressDialog(self, "處理中")
+        
+        # Process in a separate thread to keep UI responsive
+        threading.Thread(
+            target=self.process_file_thread,
+            args=(self.current_file, progress_dialog),
+            daemon=True
+        ).start()
+
+    def export_file_thread(self, filepath, save_path, progress_dialog):
+        try:
+            progress_dialog.update_status("正在匯出對應欄位...")
+            stats = CommentStats()
+            count = export_mapped_columns(filepath, save_path, stats=stats)
+            progress_dialog.destroy()
+            MacOSAlert(self, "完成", f"已匯出 {count} 筆資料至：\n{Path(save_path).name}\n\n原始檔案未被修改。\n{stats}", "info")
+            self.status_var.set("匯出完成")
+        except Exception as e:
+            progress_dialog.destroy()
+            MacOSAlert(self, "錯誤", f"匯出時發生錯誤：\n{str(e)}", "error")
+            self.status_var.set("匯出時發生錯誤")
+
+    def export_file(self):
+        if not self.current_file:
+            MacOSAlert(self, "注意", "請先選擇一個 Excel 檔案。", "warning")
+            return
+
+        save_path = filedialog.asksaveasfilename(
+            title="匯出對應欄位",
+            defaultextension=".csv",
+            initialfile=Path(self.current_file).stem + ".csv",
+            filetypes=[("CSV 檔案", "*.csv"), ("JSON Lines", "*.jsonl")]
+        )
+        if not save_path:
+            return
+
+        progress_dialog = ProgressDialog(self, "匯出中")
+        threading.Thread(
+            target=self.export_file_thread,
+            args=(self.current_file, save_path, progress_dialog),
+            daemon=True
+        ).start()
+
+    def open_update_dialog(self):
+        UpdateDialog(self)
+
+# Set macOS-style appearance for the application
+def set_macos_appearance():
+    try:
+        # For macOS
+        import platform
+        if platform.system() == 'Darwin':
+            os.system('''defaults write -g NSRequiresAquaSystemAppearance -bool YES''')
+            from tkmacosx import ColorVar, ColorscaleVar
+    except:
+        pass
+
+def run_gui():
+    set_macos_appearance()
+    app = MainApplication()
+    app.mainloop()
+
+if __name__ == '__main__':
+    multiprocessing.freeze_support()  # 打包成 exe 時 process pool 需要
+    run_gui()
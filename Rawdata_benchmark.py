@@ -0,0 +1,297 @@
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ProcessPoolExecutor
+
+from Rawdata_extract import PARSER_VERSION, iter_extract_data, keyword_to_header, parse_params, save_data
+
+# 產生測試用參數列時使用的 key 與值
+SAMPLE_KEYS = ["Vcc", "Vhh", "ICC1", "Vih", "pin", "CS", "I", "D", "RC", "Tspec", "T", "Gate",
+               "Drain", "X1", "X2", "OPT[31:0]", "Tbusy", "PST", "Twc", "Terase", "VREF", "MODE"]
+SAMPLE_VALUES = ["3.3V", "1.8", "9V", "0x3FF", "10uA", "1.5mS", "200uS", "ON", "0", "A5A5A5A5"]
+
+def legacy_parse_params(all_kv_part):
+    """舊版做法：每個 keyword 各自 re.search 一次，作為比較基準"""
+    params = {}
+    t_match = re.search(r"T=\s*([\d\.]+mS)", all_kv_part, re.IGNORECASE)
+    if t_match:
+        params["T"] = t_match.group(1)
+    for k in keyword_to_header:
+        kv_match = re.search(rf"{re.escape(k)}=([^;,\s\)]+)", all_kv_part)
+        if kv_match:
+            params[k] = kv_match.group(1)
+    return params
+
+def make_param_lines(count, seed=0):
+    rnd = random.Random(seed)
+    lines = []
+    for _ in range(count):
+        keys = rnd.sample(SAMPLE_KEYS, rnd.randint(2, 8))
+        lines.append(", ".join(f"{k}={rnd.choice(SAMPLE_VALUES)}" for k in keys))
+    return lines
+
+def time_rows(func, lines, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            func(line)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return len(lines) / best
+
+def bench_params(rows, repeat):
+    lines = make_param_lines(rows)
+    for line in lines:
+        if legacy_parse_params(line) != parse_params(line):
+            raise AssertionError(f"結果不一致：{line}")
+
+    before = time_rows(legacy_parse_params, lines, repeat)
+    after = time_rows(parse_params, lines, repeat)
+    print(f"參數列解析 ({rows} 筆，取 {repeat} 次最佳)")
+    print(f"  before (逐 key re.search): {before:12,.0f} rows/sec")
+    print(f"  after  (parse_params)    : {after:12,.0f} rows/sec")
+    print(f"  speedup: {after / before:.1f}x")
+
+def measure_memory(build):
+    """回傳 build() 建出的物件在記憶體中保留的 bytes 數"""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        data = build()
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+    return len(data), after - before
+
+def bench_memory(filepath):
+    # 兩種表示法都從同一份解析結果建立，差異只在每一列的資料結構
+    count, row_bytes = measure_memory(lambda: list(iter_extract_data(filepath)))
+    _, dict_bytes = measure_memory(lambda: [row.to_dict() for row in iter_extract_data(filepath)])
+    print(f"記憶體用量 ({count} 筆)")
+    print(f"  dict (46 個 key): {dict_bytes / 1024 / 1024:10.2f} MB  ({dict_bytes / max(count, 1):6.0f} bytes/row)")
+    print(f"  Row             : {row_bytes / 1024 / 1024:10.2f} MB  ({row_bytes / max(count, 1):6.0f} bytes/row)")
+    print(f"  節省: {1 - row_bytes / max(dict_bytes, 1):.0%}")
+
+SIZE_UNITS = {"KB": 1024, "MB": 1024 ** 2, "GB": 1024 ** 3}
+
+def parse_size(text):
+    """"500MB"、"5GB" 轉成 bytes"""
+    text = text.strip().upper()
+    for unit, factor in SIZE_UNITS.items():
+        if text.endswith(unit):
+            return int(float(text[:-len(unit)]) * factor)
+    return int(text)
+
+def format_size(size):
+    for unit in ("GB", "MB", "KB"):
+        if size >= SIZE_UNITS[unit] and size % SIZE_UNITS[unit] == 0:
+            return f"{size // SIZE_UNITS[unit]}{unit}"
+    return f"{size}B"
+
+# 合成 rawdata 的各種行
+NOISE_LINES = [
+    "Site {site} PASS",
+    "Site {site} FAIL  BIN={bin}",
+    "{time} Start test",
+    "Read back = 0x{data:08X}",
+    "  {value:.4f}  {value2:.4f}  {value:.4f}",
+    "Pattern {bin} loaded (S)",
+    "Wait ...",
+]
+
+def make_item_block(rnd, index):
+    """產生一個 Item 區塊：標題列，加上參數列、Measure Check 或沒有 Detail 其中一種內容"""
+    lines = [f"############ Item {index}: {rnd.choice(['ICC1', 'Leakage', 'Program', 'Erase', 'Read'])} ############"]
+    kind = rnd.random()
+    noise = rnd.randint(2, 12)
+    for _ in range(noise):
+        lines.append(rnd.choice(NOISE_LINES).format(
+            site=rnd.randint(1, 8), bin=rnd.randint(1, 30), data=rnd.getrandbits(32),
+            time=f"{rnd.randint(0, 23):02d}:{rnd.randint(0, 59):02d}:{rnd.randint(0, 59):02d}",
+            value=rnd.random(), value2=rnd.random()))
+    if kind < 0.6:
+        keys = rnd.sample(SAMPLE_KEYS, rnd.randint(2, 8))
+        params = ", ".join(f"{k}={rnd.choice(SAMPLE_VALUES)}" for k in keys)
+        lines.insert(rnd.randint(1, len(lines)), f"{rnd.choice(['ICC1_Test', 'Prog', 'Erase_Verify'])}({params})")
+    elif kind < 0.85:
+        for pin in range(rnd.randint(1, 6)):
+            lines.append(f"{rnd.choice(['IIL', 'IIH', 'ILO'])}[{pin}] Measure Check({rnd.uniform(0, 5):.2f}uA); SPEC=10uA")
+    return "\n".join(lines) + "\n"
+
+def generate_rawdata(path, size, seed=0):
+    """寫出約 size bytes 的合成 rawdata；先產生一批區塊再循環使用，5GB 也能在合理時間內完成"""
+    rnd = random.Random(seed)
+    blocks = [make_item_block(rnd, i) for i in range(2000)]
+    written = 0
+    index = 0
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        while written < size:
+            block = blocks[index % len(blocks)]
+            if index >= len(blocks):
+                # 換掉 Item 編號，讓重複的區塊仍有不同的 Item 名稱
+                block = block.replace(f"Item {index % len(blocks)}:", f"Item {index}:", 1)
+            f.write(block)
+            written += len(block.encode('utf-8'))
+            index += 1
+    return written
+
+def count_lines(path):
+    count = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            count += chunk.count(b"\n")
+    return count
+
+def peak_rss_mb():
+    """目前 process 的最高記憶體用量 (MB)；無法取得時回傳 None"""
+    try:
+        import resource
+    except ImportError:
+        try:
+            import psutil
+        except ImportError:
+            return None
+        return psutil.Process().memory_info().peak_wset / 1024 / 1024
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 單位為 KB，macOS 為 bytes
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024
+
+def stage_parse(path, lines):
+    start = time.perf_counter()
+    rows = sum(1 for _ in iter_extract_data(path))
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "rows": rows, "lines_per_sec": lines / elapsed,
+            "rows_per_sec": rows / elapsed, "peak_rss_mb": peak_rss_mb()}
+
+def stage_export(path, fmt, out_dir):
+    """只量輸出的時間：先解析成 list，再計時寫檔"""
+    rows = list(iter_extract_data(path))
+    save_path = os.path.join(out_dir, f"{os.path.splitext(os.path.basename(path))[0]}.{fmt}")
+    start = time.perf_counter()
+    save_data(rows, save_path)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "rows": len(rows), "rows_per_sec": len(rows) / elapsed,
+            "output_bytes": os.path.getsize(save_path), "peak_rss_mb": peak_rss_mb()}
+
+def stage_pipeline(path, fmt, out_dir):
+    """從 TXT 串流解析直接寫檔，與 GUI / batch 的實際用法相同"""
+    save_path = os.path.join(out_dir, f"{os.path.splitext(os.path.basename(path))[0]}_pipeline.{fmt}")
+    start = time.perf_counter()
+    rows = save_data(iter_extract_data(path), save_path)
+    elapsed = time.perf_counter() - start
+    return {"seconds": elapsed, "rows": rows, "rows_per_sec": rows / elapsed, "peak_rss_mb": peak_rss_mb()}
+
+def run_isolated(func, *args):
+    # 每個階段在新的 process 執行，peak RSS 才不會被前一個階段影響
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(func, *args).result()
+
+def run_suite(sizes, formats, work_dir, seed=0):
+    os.makedirs(work_dir, exist_ok=True)
+    results = []
+    for size in sizes:
+        path = os.path.join(work_dir, f"synthetic_{format_size(size)}_seed{seed}.txt")
+        if not os.path.exists(path):
+            print(f"產生 {path} ...")
+            generate_rawdata(path, size, seed)
+        lines = count_lines(path)
+        entry = {"size": format_size(size), "file": path, "bytes": os.path.getsize(path), "lines": lines, "stages": {}}
+
+        entry["stages"]["parse"] = run_isolated(stage_parse, path, lines)
+        for fmt in formats:
+            entry["stages"][f"export_{fmt}"] = run_isolated(stage_export, path, fmt, work_dir)
+            entry["stages"][f"pipeline_{fmt}"] = run_isolated(stage_pipeline, path, fmt, work_dir)
+
+        print_entry(entry)
+        results.append(entry)
+    return {
+        "meta": {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "parser_version": PARSER_VERSION,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+def print_entry(entry):
+    print(f"{entry['size']} ({entry['lines']:,} 行)")
+    for name, stage in entry["stages"].items():
+        rss = f"{stage['peak_rss_mb']:8.1f} MB" if stage.get("peak_rss_mb") is not None else "       n/a"
+        extra = f"  {stage['lines_per_sec']:12,.0f} lines/s" if "lines_per_sec" in stage else ""
+        print(f"  {name:18} {stage['seconds']:8.2f}s  {stage['rows_per_sec']:12,.0f} rows/s  peak {rss}{extra}")
+
+def compare_results(old_path, new_path):
+    with open(old_path, 'r', encoding='utf-8') as f:
+        old = {entry["size"]: entry for entry in json.load(f)["results"]}
+    with open(new_path, 'r', encoding='utf-8') as f:
+        new = {entry["size"]: entry for entry in json.load(f)["results"]}
+    for size in new:
+        if size not in old:
+            continue
+        print(size)
+        for name, stage in new[size]["stages"].items():
+            before = old[size]["stages"].get(name)
+            if not before:
+                continue
+            ratio = stage["rows_per_sec"] / before["rows_per_sec"]
+            print(f"  {name:18} {before['rows_per_sec']:12,.0f} -> {stage['rows_per_sec']:12,.0f} rows/s  ({ratio:.2f}x)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rawdata_extract 效能測試")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("params", help="比較參數列解析 before/after 的 rows/sec")
+    p.add_argument("--rows", type=int, default=20000)
+    p.add_argument("--repeat", type=int, default=3)
+
+    p = sub.add_parser("memory", help="比較每列使用 dict 與 Row 的記憶體用量")
+    p.add_argument("file", help="要解析的 rawdata TXT 檔")
+
+    p = sub.add_parser("generate", help="產生合成的 CP rawdata 檔")
+    p.add_argument("output", help="輸出 TXT 檔")
+    p.add_argument("--size", default="10MB", help="檔案大小，例如 1MB、500MB、5GB (預設 10MB)")
+    p.add_argument("--seed", type=int, default=0)
+
+    p = sub.add_parser("run", help="依不同檔案大小量測解析與輸出效能，結果存成 JSON")
+    p.add_argument("--sizes", default="1MB,10MB", help="以逗號分隔的檔案大小 (預設 1MB,10MB)")
+    p.add_argument("--formats", default="csv,xlsx", help="要量測的輸出格式 (預設 csv,xlsx)")
+    p.add_argument("--work-dir", default="bench_data", help="合成檔與輸出檔的資料夾 (預設 bench_data)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--json", help="結果 JSON 檔 (預設 bench_data/results_<時間>.json)")
+
+    p = sub.add_parser("compare", help="比較兩次 run 的 JSON 結果")
+    p.add_argument("old")
+    p.add_argument("new")
+
+    args = parser.parse_args(argv)
+    if args.command == "params":
+        bench_params(args.rows, args.repeat)
+    elif args.command == "memory":
+        bench_memory(args.file)
+    elif args.command == "generate":
+        written = generate_rawdata(args.output, parse_size(args.size), args.seed)
+        print(f"已產生 {args.output} ({written:,} bytes)")
+    elif args.command == "run":
+        sizes = [parse_size(size) for size in args.sizes.split(",")]
+        formats = [fmt.strip() for fmt in args.formats.split(",") if fmt.strip()]
+        report = run_suite(sizes, formats, args.work_dir, args.seed)
+        json_path = args.json or os.path.join(args.work_dir, f"results_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"結果已存到 {json_path}")
+    elif args.command == "compare":
+        compare_results(args.old, args.new)
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
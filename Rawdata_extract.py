@@ -1,13 +1,27 @@
-import tkinter as tk
-from tkinter import filedialog, font
 import re
-from openpyxl import Workbook
-from openpyxl.utils import get_column_letter
+import sys
+import csv
+import gzip
+import mmap
+import queue
+import multiprocessing
+import zipfile
+import json
+import pickle
+import hashlib
+import tempfile
+import shutil
+from functools import lru_cache
+from itertools import islice
+from openpyxl import Workbook, load_workbook
 import os
+import glob
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 import threading
 import time
-from tkinter import ttk
 
 # Excel 表頭欄位
 HEADERS = [
@@ -19,545 +33,1710 @@ HEADERS = [
 
 keyword_to_header = {k.strip("=").strip(): k.strip("=").strip() for k in HEADERS[2:]}  # 忽略前兩欄 Item, Detail
 
-class TooltipBase:
-    def __init__(self, widget, text, delay=500, **kwargs):
-        self.widget = widget
-        self.text = text
-        self.delay = delay
-        
-        self.tooltip = None
-        self.id = None
-        
-        self.style_kwargs = {
-            'bg': '#2a2a2a',
-            'fg': '#e0e0e0',
-            'padx': 10,
-            'pady': 5,
-            'bd': 0,
-            'relief': 'solid'
-        }
-        self.style_kwargs.update(kwargs)
-        
-        self.widget.bind("<Enter>", self.schedule)
-        self.widget.bind("<Leave>", self.hide)
-        self.widget.bind("<Button-1>", self.hide)
-    
-    def schedule(self, event=None):
-        self.id = self.widget.after(self.delay, self.show)
-    
-    def show(self, event=None):
-        self.hide()
-        
-        x, y, _, _ = self.widget.bbox("insert")
-        x += self.widget.winfo_rootx() + 25
-        y += self.widget.winfo_rooty() + 25
-        
-        self.tooltip = tk.Toplevel(self.widget)
-        self.tooltip.wm_overrideredirect(True)
-        self.tooltip.wm_geometry(f"+{x}+{y}")
-        
-        label = tk.Label(self.tooltip, text=self.text, justify='left', **self.style_kwargs)
-        label.pack()
-    
-    def hide(self, event=None):
-        if self.id:
-            self.widget.after_cancel(self.id)
-            self.id = None
-        
-        if self.tooltip:
-            self.tooltip.destroy()
-            self.tooltip = None
-
-class MacOSButton(tk.Canvas):
-    def __init__(self, master, text="", command=None, width=200, height=34, corner_radius=6, 
-                 bg='#333333', fg='#ffffff', hover_color='#404040', **kwargs):
-        super().__init__(master, width=width, height=height, bg=bg, bd=0, 
-                         highlightthickness=0, relief="ridge", **kwargs)
-        
-        self.command = command
-        self.corner_radius = corner_radius
-        self.bg = bg
-        self.fg = fg
-        self.hover_color = hover_color
-        self.configure(cursor="hand2")
-        
-        # Initial button state
-        self.button_state = "normal"
-        
-        # Draw the rounded rectangle button
-        self.rect = self.create_rounded_rect(0, 0, width, height, corner_radius, fill=bg, outline="")
-        self.text_id = self.create_text(width/2, height/2, text=text, fill=fg, font=("SF Pro Text", 12))
-        
-        # Bind events
-        self.bind("<Enter>", self.on_enter)
-        self.bind("<Leave>", self.on_leave)
-        self.bind("<ButtonPress-1>", self.on_press)
-        self.bind("<ButtonRelease-1>", self.on_release)
-
-    def create_rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
-        points = [
-            x1+radius, y1,
-            x1+radius, y1,
-            x2-radius, y1,
-            x2-radius, y1,
-            x2, y1,
-            x2, y1+radius,
-            x2, y1+radius,
-            x2, y2-radius,
-            x2, y2-radius,
-            x2, y2,
-            x2-radius, y2,
-            x2-radius, y2,
-            x1+radius, y2,
-            x1+radius, y2,
-            x1, y2,
-            x1, y2-radius,
-            x1, y2-radius,
-            x1, y1+radius,
-            x1, y1+radius,
-            x1, y1
-        ]
-        return self.create_polygon(points, **kwargs, smooth=True)
-
-    def on_enter(self, e):
-        self.itemconfig(self.rect, fill=self.hover_color)
-
-    def on_leave(self, e):
-        self.itemconfig(self.rect, fill=self.bg)
-
-    def on_press(self, e):
-        self.itemconfig(self.rect, fill="#555555")  # Darker when pressed
-
-    def on_release(self, e):
-        self.itemconfig(self.rect, fill=self.hover_color)
-        if self.command:
-            self.command()
-
-class ProgressDialog(tk.Toplevel):
-    def __init__(self, parent, title="處理中"):
-        super().__init__(parent)
-        self.title(title)
-        self.configure(bg="#2a2a2a")
-        self.resizable(False, False)
-        self.transient(parent)
-        self.grab_set()
-        
-        # Calculate position to center on parent
-        parent_x = parent.winfo_rootx()
-        parent_y = parent.winfo_rooty()
-        parent_width = parent.winfo_width()
-        parent_height = parent.winfo_height()
-        
-        width = 300
-        height = 80
-        x = parent_x + (parent_width - width) // 2
-        y = parent_y + (parent_height - height) // 2
-        
-        self.geometry(f"{width}x{height}+{x}+{y}")
-        
-        self.label = tk.Label(self, text="正在處理檔案...", bg="#2a2a2a", fg="#ffffff", font=("SF Pro Text", 12))
-        self.label.pack(pady=(10, 0))
-        
-        self.progress = ttk.Progressbar(self, orient="horizontal", mode="indeterminate", length=250)
-        self.progress.pack(pady=15, padx=25)
-        self.progress.start(10)
-        
-    def update_status(self, text):
-        self.label.config(text=text)
-        self.update()
-
-class MacOSAlert(tk.Toplevel):
-    def __init__(self, parent, title, message, icon_type="info"):
-        super().__init__(parent)
-        self.title("")
-        self.configure(bg="#2a2a2a")
-        self.resizable(False, False)
-        self.transient(parent)
-        
-        # No window decorations on macOS-style dialogs
-        self.overrideredirect(True)
-        
-        # Calculate position to center on parent
-        parent_x = parent.winfo_rootx()
-        parent_y = parent.winfo_rooty()
-        parent_width = parent.winfo_width()
-        parent_height = parent.winfo_height()
-        
-        width = 400
-        height = 170
-        x = parent_x + (parent_width - width) // 2
-        y = parent_y + (parent_height - height) // 2
-        
-        self.geometry(f"{width}x{height}+{x}+{y}")
-        
-        # Add drop shadow effect (simulated with a frame)
-        shadow_frame = tk.Frame(self, bg="#1a1a1a", bd=0)
-        shadow_frame.place(x=3, y=3, width=width, height=height)
-        
-        # Main content frame
-        main_frame = tk.Frame(self, bg="#2a2a2a", bd=0)
-        main_frame.place(x=0, y=0, width=width, height=height)
-        
-        # Icon and title frame
-        header_frame = tk.Frame(main_frame, bg="#2a2a2a", height=40)
-        header_frame.pack(fill=tk.X, pady=(15, 5))
-        
-        # Icon (represented as text for simplicity)
-        if icon_type == "info":
-            icon_text = "ℹ️"
-        elif icon_type == "warning":
-            icon_text = "⚠️"
-        elif icon_type == "error":
-            icon_text = "❌"
-        else:
-            icon_text = "ℹ️"
-            
-        icon_label = tk.Label(header_frame, text=icon_text, bg="#2a2a2a", fg="#ffffff", font=("SF Pro Text", 24))
-        icon_label.pack(side=tk.LEFT, padx=(20, 0))
-        
-        # Title
-        title_label = tk.Label(header_frame, text=title, bg="#2a2a2a", fg="#ffffff", font=("SF Pro Text", 16, "bold"))
-        title_label.pack(side=tk.LEFT, padx=10)
-        
-        # Message
-        message_frame = tk.Frame(main_frame, bg="#2a2a2a")
-        message_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=5)
-        
-        message_label = tk.Label(message_frame, text=message, bg="#2a2a2a", fg="#e0e0e0", 
-                                font=("SF Pro Text", 12), wraplength=360, justify="left")
-        message_label.pack(fill=tk.BOTH, expand=True)
-        
-        # Button frame
-        button_frame = tk.Frame(main_frame, bg="#2a2a2a", height=50)
-        button_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        self.ok_button = MacOSButton(button_frame, text="確定", command=self.destroy, 
-                                    width=80, height=30, bg="#0066cc", hover_color="#0077ee")
-        self.ok_button.pack(side=tk.RIGHT, padx=(0, 20))
-        
-        # Make dialog modal
-        self.grab_set()
-        self.focus_set()
-        
-        # Position the window in the center of the parent
-        self.update_idletasks()
-        
-        # Add a subtle bounce animation
-        self.animate_entrance()
-        
-        # Bind Escape key to close
-        self.bind("<Escape>", lambda e: self.destroy())
-        
-    def animate_entrance(self):
-        # Store original position
-        orig_y = self.winfo_y()
-        
-        # Start slightly above
-        self.geometry(f"+{self.winfo_x()}+{orig_y-15}")
-        self.update_idletasks()
-        
-        # Bounce down
-        def bounce_down():
-            for i in range(15):
-                self.geometry(f"+{self.winfo_x()}+{self.winfo_y()+1}")
-                self.update_idletasks()
-                time.sleep(0.01)
-        
-        threading.Thread(target=bounce_down, daemon=True).start()
-
-def extract_data(filepath):
-    with open(filepath, 'r', encoding='utf-8') as f:
-        lines = f.readlines()
-
-    data = []
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
+# Item 標題列：#### Item ####
+ITEM_PATTERN = re.compile(r"#+\s*(.+?)\s*#+$")
+# 行尾括號參數：Detail(參數1=值1, 參數2=值2...)
+PARAM_TAIL_PATTERN = re.compile(r"\(([^\)]*?)\)\s*$")
+PARAM_STRIP_PATTERN = re.compile(r"\([^\)]*\)\s*$")
+# 特殊格式：xxx[...] Measure Check(yyy); SPEC=...
+MEASURE_CHECK_PATTERN = re.compile(r"\[.*?\].*?Measure Check\([^\)]+\)")
+MEASURE_VALUE_PATTERN = re.compile(r"Measure Check\(([^)]+)\)")
+MEASURE_STRIP_PATTERN = re.compile(r"\(.*?\)\s*;.*")
+T_MS_PATTERN = re.compile(r"T=\s*([\d\.]+mS)", re.IGNORECASE)
+# 參數列 key=value：key 取 "=" 前連續的字元，value 以 ; , 空白 ) 結尾 (可能為空)
+KV_TOKEN_PATTERN = re.compile(r"([\w\[\]:]+)=(?=([^;,\s\)]*))")
+KEYWORD_LENGTHS = sorted({len(k) for k in keyword_to_header}, reverse=True)
+HEADER_INDEX = {h: i for i, h in enumerate(HEADERS)}
 
-        # 偵測 Item 標題列
-        match = re.match(r"#+\s*(.+?)\s*#+$", line)
-        if match:
-            base_item = match.group(1).strip()
-
-            # 找下一個 Item 的邊界
-            next_item_index = i + 1
-            while next_item_index < len(lines):
-                if re.match(r"#+\s*(.+?)\s*#+$", lines[next_item_index]):
-                    break
-                next_item_index += 1
-
-            # 尋找參數格式或特殊格式
-            found = False
-            for j in range(i + 1, next_item_index):
-                detail_line = lines[j].strip().rstrip(".")
-
-                # --- 原本條件判斷 (保留不動) ---
-                if (
-                    "(" in detail_line and ")" in detail_line
-                    and "(S)" not in detail_line
-                    and "[" not in detail_line
-                    and "]" not in detail_line
-                    and re.search(r"\([^\)]*?\)\s*$", detail_line)
-                ):
-                    row_data = {h: "" for h in HEADERS}
-                    row_data["Item"] = base_item
-                    row_data["Detail"] = re.sub(r"\([^\)]*\)\s*$", "", detail_line).strip()
-                    param_match = re.search(r"\(([^\)]*?)\)\s*$", detail_line)
-                    if param_match:
-                        all_kv_part = param_match.group(1)
-                        t_match = re.search(r"T=\s*([\d\.]+mS)", all_kv_part, re.IGNORECASE)
-                        if t_match:
-                            row_data["T"] = t_match.group(1)
-                        for k in keyword_to_header:
-                            kv_match = re.search(rf"{re.escape(k)}=([^;,\s\)]+)", all_kv_part)
-                            if kv_match:
-                                row_data[k] = kv_match.group(1)
-                    data.append(row_data)
-                    found = True
+class Row:
+    """一筆擷取結果，只保存有值的欄位，取代原本 46 個 key 的 dict
+
+    fields 為依 HEADERS 順序排列的扁平 tuple：(欄位索引, 值, 欄位索引, 值, ...)。
+    提供 get / [] / keys，原本以 dict 讀取資料的程式可以直接沿用。
+    """
+    __slots__ = ("item", "detail", "fields")
+
+    def __init__(self, item, detail="", fields=()):
+        self.item = item
+        self.detail = detail
+        self.fields = fields
+
+    @classmethod
+    def from_params(cls, item, detail, params):
+        """params 為 {header: value}；Item / Detail 字串會 intern，相同名稱只存一份"""
+        fields = []
+        for header in sorted(params, key=HEADER_INDEX.get):
+            if params[header]:
+                fields += (HEADER_INDEX[header], params[header])
+        return cls(sys.intern(item), sys.intern(detail), tuple(fields))
+
+    def as_list(self):
+        """依 HEADERS 順序回傳所有欄位值，沒有值的欄位為空字串"""
+        values = [""] * len(HEADERS)
+        values[0] = self.item
+        values[1] = self.detail
+        fields = self.fields
+        for i in range(0, len(fields), 2):
+            values[fields[i]] = fields[i + 1]
+        return values
+
+    def to_dict(self):
+        return dict(zip(HEADERS, self.as_list()))
+
+    def keys(self):
+        return HEADERS
+
+    def __getitem__(self, header):
+        index = HEADER_INDEX[header]
+        if index == 0:
+            return self.item
+        if index == 1:
+            return self.detail
+        fields = self.fields
+        for i in range(0, len(fields), 2):
+            if fields[i] == index:
+                return fields[i + 1]
+        return ""
+
+    def get(self, header, default=None):
+        if header not in HEADER_INDEX:
+            return default
+        return self[header]
+
+    def __eq__(self, other):
+        if isinstance(other, Row):
+            return (self.item, self.detail, self.fields) == (other.item, other.detail, other.fields)
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __reduce__(self):
+        return (Row, (self.item, self.detail, self.fields))
+
+    def __repr__(self):
+        return f"Row({self.item!r}, {self.detail!r}, {self.fields!r})"
+
+def select_columns(columns=None):
+    """回傳要輸出的欄位 (依 HEADERS 順序)；未指定時為全部欄位，Item / Detail 一律保留"""
+    if not columns:
+        return HEADERS
+    unknown = [c for c in columns if c not in HEADER_INDEX]
+    if unknown:
+        raise ValueError(f"未知的欄位：{', '.join(unknown)}")
+    wanted = set(columns) | {"Item", "Detail"}
+    return [h for h in HEADERS if h in wanted]
+
+def keyword_lookup(columns=None):
+    """回傳 parse_params 使用的 (keyword 集合, keyword 長度由長到短)，只包含 columns 內的參數"""
+    if not columns:
+        return keyword_to_header, KEYWORD_LENGTHS
+    keywords = {k for k in select_columns(columns) if k in keyword_to_header}
+    return keywords, sorted({len(k) for k in keywords}, reverse=True)
+
+def row_values(row_data, columns=None):
+    """依 columns (預設 HEADERS) 順序取出一列的值，支援 Row 與 dict"""
+    if isinstance(row_data, Row):
+        values = row_data.as_list()
+        if columns is None or columns is HEADERS:
+            return values
+        return [values[HEADER_INDEX[header]] for header in columns]
+    return [row_data.get(header, "") for header in columns or HEADERS]
+
+def parse_params(all_kv_part, lookup=None):
+    """一次掃描括號內的參數，回傳 {header: value}
+
+    與逐一 re.search(rf"{k}=...") 相同：每個 keyword 取第一個有值的 "k="，
+    包含出現在較長名稱結尾的情況 (例如 PST= 也會被 T 取到)。
+    lookup 為 keyword_lookup() 的結果，只指定部分欄位時其他 key 直接略過。
+    """
+    keywords, lengths = lookup or (keyword_to_header, KEYWORD_LENGTHS)
+    params = {}
+    if not keywords:
+        return params
+    for m in KV_TOKEN_PATTERN.finditer(all_kv_part):
+        value = m.group(2)
+        if not value:
+            continue
+        key = m.group(1)
+        for length in lengths:
+            if length > len(key):
+                continue
+            k = key[-length:]
+            if k in keywords and k not in params:
+                params[k] = value
+        if len(params) == len(keywords):
+            # 需要的欄位都找到了
+            break
+    if "T" not in params and "T" in keywords:
+        t_match = T_MS_PATTERN.search(all_kv_part)
+        if t_match:
+            params["T"] = t_match.group(1)
+    return params
+
+# Item 區塊內 Detail 行的辨識規則，依順序嘗試，第一個產生資料的規則生效
+#   require / exclude：行內必須包含 / 不能包含的字串 (只用 in 判斷，比 regex 便宜，先檢查)
+#   match：必須 search 得到的 regex；params=true 時 group(1) 為 k=v 參數清單
+#   value / field：另外以 regex group(1) 取一個值放進 field 欄位
+#   detail_strip：從行內刪掉這個 regex 後剩下的部分當作 Detail
+#   stop：此規則命中後，同一個 Item 後面的行都略過
+DEFAULT_RULE_SPECS = [
+    {
+        "name": "param_tail",
+        "require": ["(", ")"],
+        "exclude": ["(S)", "[", "]"],
+        "match": PARAM_TAIL_PATTERN.pattern,
+        "params": True,
+        "detail_strip": PARAM_STRIP_PATTERN.pattern,
+        "stop": True,
+    },
+    {
+        "name": "measure_check",
+        "require": ["Measure Check(", "["],
+        "match": MEASURE_CHECK_PATTERN.pattern,
+        "value": MEASURE_VALUE_PATTERN.pattern,
+        "field": "I",
+        "detail_strip": MEASURE_STRIP_PATTERN.pattern,
+    },
+]
+RULE_KEYS = {"name", "require", "exclude", "match", "params", "value", "field", "detail_strip", "stop"}
+
+class Rule:
+    """一條編譯好的 Detail 行規則，hits / tried / seconds 為命中次數、嘗試次數與花費時間"""
+
+    def __init__(self, spec):
+        if not isinstance(spec, dict):
+            raise ValueError(f"規則必須是 JSON 物件，不是 {type(spec).__name__}：{spec!r}")
+        unknown = set(spec) - RULE_KEYS
+        name = spec.get("name")
+        if not name or not isinstance(name, str):
+            raise ValueError("規則缺少 name")
+        if unknown:
+            raise ValueError(f"規則 {name} 有未知的設定：{', '.join(sorted(unknown))}")
+        if not spec.get("match"):
+            raise ValueError(f"規則 {name} 缺少 match")
+        for key in ("match", "value", "detail_strip"):
+            if key in spec and not isinstance(spec[key], str):
+                raise ValueError(f"規則 {name} 的 {key} 必須是字串")
+        for key in ("require", "exclude"):
+            if key in spec and not (isinstance(spec[key], list) and all(isinstance(k, str) for k in spec[key])):
+                raise ValueError(f"規則 {name} 的 {key} 必須是字串的 list")
+        if spec.get("value") and spec.get("field") not in keyword_to_header:
+            raise ValueError(f"規則 {name} 的 field 必須是參數欄位之一：{spec.get('field')}")
+        if spec.get("field") and not spec.get("value"):
+            raise ValueError(f"規則 {name} 有 field 但沒有 value")
+        try:
+            self.match = re.compile(spec["match"])
+            self.value = re.compile(spec["value"]) if spec.get("value") else None
+            self.detail_strip = re.compile(spec["detail_strip"]) if spec.get("detail_strip") else None
+        except re.error as e:
+            raise ValueError(f"規則 {name} 的 regex 有誤：{e}") from None
+        if spec.get("params") and self.match.groups < 1:
+            raise ValueError(f"規則 {name} 的 match 需要一個 group 放參數清單")
+        self.spec = spec
+        self.name = name
+        self.require = tuple(spec.get("require", ()))
+        self.exclude = tuple(spec.get("exclude", ()))
+        self.params = bool(spec.get("params"))
+        self.field = spec.get("field")
+        self.stop = bool(spec.get("stop"))
+        self.hits = 0
+        self.tried = 0
+        self.seconds = 0.0
+
+    def apply(self, base_item, line, lookup=None):
+        """符合時回傳 Row，否則回傳 None"""
+        for keyword in self.require:
+            if keyword not in line:
+                return None
+        for keyword in self.exclude:
+            if keyword in line:
+                return None
+        match = self.match.search(line)
+        if match is None:
+            return None
+        # params 的 group 可能沒有比對到 (例如 (...)?)，當作沒有參數
+        params = parse_params(match.group(1) or "", lookup) if self.params else {}
+        if self.value is not None:
+            value_match = self.value.search(line)
+            if value_match is None:
+                return None
+            keywords = lookup[0] if lookup else keyword_to_header
+            if self.field in keywords:
+                params[self.field] = value_match.group(1).strip()
+        detail = self.detail_strip.sub("", line) if self.detail_strip is not None else line
+        return Row.from_params(base_item, detail.strip(), params)
+
+class RuleSet:
+    """依序嘗試的規則表
+
+    prefilter 為每條規則 require 的第一個字串；一行裡一個都沒有時不必逐條嘗試。
+    line_keywords 再加上 Item 標題的 #，不含其中任何一個的行在 bytes 階段就跳過；
+    有規則沒有 require 時為 None (每一行都要解碼)。
+    profile=True 時另外記錄每條規則的嘗試次數與時間 (會稍微變慢)。
+    """
+
+    def __init__(self, specs=None, profile=False):
+        self.rules = []
+        for index, spec in enumerate(DEFAULT_RULE_SPECS if specs is None else specs, 1):
+            try:
+                self.rules.append(Rule(spec))
+            except ValueError as e:
+                raise ValueError(f"第 {index} 條規則：{e}") from None
+        prefilter = []
+        for rule in self.rules:
+            if not rule.require:
+                # 沒有 require 的規則每一行都要試
+                prefilter = []
+                break
+            prefilter.append(rule.require[0])
+        self.prefilter = tuple(dict.fromkeys(prefilter))
+        self.line_keywords = ("#",) + self.prefilter if self.prefilter or not self.rules else None
+        self.profile = profile
+        self.skipped = 0
+
+    def fingerprint(self):
+        """規則內容的 hash，快取與 tail 進度用來判斷結果是否可以沿用"""
+        text = json.dumps([rule.spec for rule in self.rules], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()[:12]
+
+    def parse(self, base_item, line, lookup=None):
+        """回傳 (row_data, stop)；沒有規則符合時 row_data 為 None"""
+        if self.prefilter:
+            for keyword in self.prefilter:
+                if keyword in line:
                     break
+            else:
+                self.skipped += 1
+                return None, False
+        for rule in self.rules:
+            if self.profile:
+                start = time.perf_counter()
+                row_data = rule.apply(base_item, line, lookup)
+                rule.seconds += time.perf_counter() - start
+                rule.tried += 1
+            else:
+                row_data = rule.apply(base_item, line, lookup)
+            if row_data is not None:
+                rule.hits += 1
+                return row_data, rule.stop
+        return None, False
+
+    def stats(self):
+        return [{"name": rule.name, "hits": rule.hits, "tried": rule.tried, "seconds": rule.seconds}
+                for rule in self.rules]
+
+DEFAULT_RULES = RuleSet()
+
+def load_rules(path):
+    """從 JSON 讀取規則表：規則 list，或 {"rules": [...]}；{"builtin": "param_tail"} 代表內建規則"""
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    specs = config.get("rules") if isinstance(config, dict) else config
+    if not isinstance(specs, list):
+        raise ValueError(f"{path}：規則設定必須是 list 或 {{\"rules\": [...]}}")
+    builtins = {spec["name"]: spec for spec in DEFAULT_RULE_SPECS}
+    resolved = []
+    for index, spec in enumerate(specs, 1):
+        if isinstance(spec, dict) and "builtin" in spec:
+            if not isinstance(spec["builtin"], str) or spec["builtin"] not in builtins:
+                raise ValueError(f"{path}：第 {index} 條規則：沒有內建規則 {spec['builtin']}，可用：{', '.join(builtins)}")
+            spec = builtins[spec["builtin"]]
+        resolved.append(spec)
+    try:
+        return RuleSet(resolved)
+    except ValueError as e:
+        raise ValueError(f"{path}：{e}") from None
+
+def parse_detail_line(base_item, detail_line, lookup=None, rules=None):
+    """解析 Item 區塊內的一行，回傳 (row_data, is_param)；不符合格式時 row_data 為 None"""
+    return (rules or DEFAULT_RULES).parse(base_item, detail_line, lookup)
 
-                # --- ✅ 新增判斷：符合結構 xxx[...] Measure Check(yyy); SPEC=... ---
-                elif re.search(r"\[.*?\].*?Measure Check\([^\)]+\)", detail_line):
-                    detail_part = re.sub(r"\(.*?\)\s*;.*", "", detail_line).strip()
-                    value_match = re.search(r"Measure Check\(([^)]+)\)", detail_line)
-                    if value_match:
-                        val = value_match.group(1).strip()
-                        row_data = {h: "" for h in HEADERS}
-                        row_data["Item"] = base_item
-                        row_data["Detail"] = detail_part
-                        row_data["I"] = val
-                        data.append(row_data)
-                        found = True  # 記錄已處理但不跳出，允許多筆連續處理
+def iter_lines_data(lines, columns=None, rules=None):
+    """單次掃描逐行解析，每找到一筆資料就 yield，不需先讀入整個檔案
+
+    指定 columns 時只擷取這些欄位的參數，其餘欄位在 Row 中為空；rules 為 RuleSet (預設 DEFAULT_RULES)。
+    """
+    lookup = keyword_lookup(columns)
+    parse = (rules or DEFAULT_RULES).parse
+    base_item = None
+    found = False
+    done = False
+    for line in lines:
+        if base_item is None:
+            # 第一個 Item 之前的內容只需尋找標題列
+            match = ITEM_PATTERN.match(line.strip())
+            if not match:
+                continue
+        else:
+            # 下一個 Item 的邊界 (與原本相同，以未 strip 的原始行判斷)
+            match = ITEM_PATTERN.match(line)
+            if not match:
+                if done:
+                    continue
+                row_data, is_param = parse(base_item, line.strip().rstrip("."), lookup)
+                if row_data is not None:
+                    yield row_data
+                    found = True
+                    # 參數格式只取第一筆，之後直到下一個 Item 都略過
+                    done = is_param
+                continue
             # 若沒找到任何 Detail/參數，仍要記錄該 Item
             if not found:
-                row_data = {h: "" for h in HEADERS}
-                row_data["Item"] = base_item
-                data.append(row_data)
+                yield Row(base_item)
+            match = ITEM_PATTERN.match(line.strip())
 
-            i = next_item_index
-        else:
-            i += 1
+        # 偵測 Item 標題列
+        base_item = sys.intern(match.group(1).strip())
+        found = False
+        done = False
 
-    return data
+    if base_item is not None and not found:
+        yield Row(base_item)
+
+# 平行解析時每段至少的大小，太小的檔案切段反而比較慢
+MIN_SHARD_SIZE = 4 * 1024 * 1024
+
+def is_item_boundary(mm, pos):
+    """pos 為行首時，判斷該行是否為 Item 邊界 (與 iter_lines_data 的判斷相同)"""
+    if mm[pos:pos + 1] != b"#":
+        return False
+    end = mm.find(b"\n", pos)
+    raw = mm[pos:end if end != -1 else len(mm)]
+    try:
+        line = raw.decode("utf-8")
+    except UnicodeDecodeError:
+        return False
+    # 文字模式下單獨的 \r 也算換行，只看第一行
+    line = re.split(r"\r\n?", line, maxsplit=1)[0]
+    return ITEM_PATTERN.match(line) is not None
+
+def next_item_boundary(mm, pos):
+    """從 pos 之後的下一行開始，找出第一個 Item 邊界的行首位置；找不到回傳 None"""
+    while True:
+        pos = mm.find(b"\n", pos)
+        if pos == -1 or pos + 1 >= len(mm):
+            return None
+        pos += 1
+        if is_item_boundary(mm, pos):
+            return pos
+
+def find_shard_ranges(filepath, shards, min_shard_size=MIN_SHARD_SIZE):
+    """把檔案切成約 shards 段 byte 範圍，每段 (第一段除外) 都從 Item 標題列開始"""
+    size = os.path.getsize(filepath)
+    shards = max(1, min(shards, size // max(min_shard_size, 1)))
+    if shards == 1:
+        return [(0, size)]
+
+    offsets = [0]
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for k in range(1, shards):
+            pos = next_item_boundary(mm, max(size * k // shards, offsets[-1]))
+            if pos is None:
+                break
+            offsets.append(pos)
+    offsets.append(size)
+    return list(zip(offsets, offsets[1:]))
+
+@lru_cache(maxsize=None)
+def candidate_line_pattern(keywords):
+    """由 RuleSet.line_keywords 組出在 bytes 上找候選行的 regex；keywords 為 None 時回傳 None (每行都解碼)
+
+    只有含這些字串的行可能是 Item 標題或被規則採用，其他行不需要解碼
+    (UTF-8 編碼後的字串不會從多位元組字元中間開始比對成功，可以直接在 bytes 上比對)。
+    """
+    if keywords is None:
+        return None
+    needles = sorted({keyword.encode("utf-8") for keyword in keywords})
+    # 含有其他字串的不必另外比對 (例如 "Measure Check(" 已含 "(")
+    needles = [needle for needle in needles if not any(other != needle and other in needle for other in needles)]
+    if all(len(needle) == 1 for needle in needles):
+        chars = re.escape(b"".join(needles))
+        try:
+            return re.compile(rb"\n([^\n" + chars + rb"]*+[" + chars + rb"][^\n]*)")
+        except re.error:
+            # Python 3.10 以前不支援 *+，結果相同只是比較慢
+            return re.compile(rb"\n([^\n" + chars + rb"]*[" + chars + rb"][^\n]*)")
+    return re.compile(rb"\n([^\n]*?(?:" + b"|".join(map(re.escape, needles)) + rb")[^\n]*)")
+
+# 內建規則為含 # 或 ( 的行
+CANDIDATE_LINE_PATTERN = candidate_line_pattern(DEFAULT_RULES.line_keywords)
+# 每次從 mmap 取出來掃描的大小
+SCAN_BLOCK_SIZE = 4 * 1024 * 1024
+# 非 UTF-8 位元組的處理方式："replace" 換成 U+FFFD 繼續解析，"strict" 直接報錯；只有被解碼的行會檢查
+DECODE_ERRORS = "replace"
+
+def iter_candidate_lines(buf, start=0, end=None, errors=DECODE_ERRORS, pattern=CANDIDATE_LINE_PATTERN):
+    """在 bytes / mmap 中找出 pattern (candidate_line_pattern 的結果) 比對到的行，只解碼這些行 (每行結尾補上 "\n")
+
+    換行與 open(..., encoding='utf-8') 相同，\r\n、\r、\n 都算一行結束。
+    """
+    end = len(buf) if end is None else end
+    pos = start
+    while pos < end:
+        # 每塊都切在換行之後
+        cut = buf.rfind(b"\n", pos, min(pos + SCAN_BLOCK_SIZE, end)) + 1
+        if cut <= pos:
+            cut = buf.find(b"\n", min(pos + SCAN_BLOCK_SIZE, end), end) + 1 or end
+        yield from iter_block_lines(buf[pos:cut], errors, pattern)
+        pos = cut
+
+def iter_block_lines(block, errors=DECODE_ERRORS, pattern=CANDIDATE_LINE_PATTERN):
+    """解碼一塊 (以換行結尾的) bytes 中可能有用的行；pattern 為 None 時每行都解碼"""
+    if b"\r" in block:
+        block = block.replace(b"\r\n", b"\n").replace(b"\r", b"\n")
+    if pattern is not None:
+        lines = pattern.findall(b"\n" + block)
+    else:
+        lines = block.split(b"\n")
+        if not lines[-1]:
+            lines.pop()
+    for line in lines:
+        try:
+            yield line.decode("utf-8", errors) + "\n"
+        except UnicodeDecodeError:
+            raise ValueError(f"含有非 UTF-8 的位元組：{line[:80]!r}") from None
 
-def save_to_excel(data, save_path):
-    wb = Workbook()
-    ws = wb.active
-    ws.title = "Extracted Data"
+def iter_stream_lines(stream, errors=DECODE_ERRORS, pattern=CANDIDATE_LINE_PATTERN):
+    """與 iter_candidate_lines 相同，但從解壓縮的 stream 依序讀取，不需要整個檔案在磁碟或記憶體中"""
+    rest = b""
+    while True:
+        chunk = stream.read(SCAN_BLOCK_SIZE)
+        if not chunk:
+            break
+        chunk = rest + chunk
+        # 切在最後一個換行之後；結尾的 \r 留到下一塊，\r\n 不會被切成兩個換行
+        limit = len(chunk) - 1 if chunk.endswith(b"\r") else len(chunk)
+        cut = max(chunk.rfind(b"\n", 0, limit), chunk.rfind(b"\r", 0, limit)) + 1
+        rest = chunk[cut:]
+        yield from iter_block_lines(chunk[:cut], errors, pattern)
+    if rest:
+        yield from iter_block_lines(rest, errors, pattern)
+
+def parse_shard(filepath, start, end, columns=None, errors=DECODE_ERRORS, rules=None):
+    pattern = candidate_line_pattern((rules or DEFAULT_RULES).line_keywords)
+    with open(filepath, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return list(iter_lines_data(iter_candidate_lines(mm, start, end, errors, pattern), columns, rules))
+
+# 檔頭 magic bytes -> 壓縮格式；沒有符合時再看副檔名
+COMPRESSION_MAGIC = {
+    b"\x1f\x8b": "gz",
+    b"\x28\xb5\x2f\xfd": "zst",
+    b"7z\xbc\xaf\x27\x1c": "7z",
+    b"PK\x03\x04": "zip",
+}
+COMPRESSION_SUFFIXES = {".gz": "gz", ".zst": "zst", ".7z": "7z", ".zip": "zip"}
+# 資料夾內要處理的檔案
+INPUT_PATTERNS = ["*.txt"] + [f"*{suffix}" for suffix in COMPRESSION_SUFFIXES]
+
+def compression_type(filepath):
+    """回傳 "gz" / "zst" / "7z" / "zip"，未壓縮的檔案回傳 None"""
+    with open(filepath, 'rb') as f:
+        head = f.read(8)
+    for magic, kind in COMPRESSION_MAGIC.items():
+        if head.startswith(magic):
+            return kind
+    return COMPRESSION_SUFFIXES.get(Path(filepath).suffix.lower())
+
+def input_stem(filepath):
+    """輸出檔名用的主檔名：lot42.txt.gz、lot42.7z 都回傳 lot42"""
+    name = Path(filepath).name
+    if Path(name).suffix.lower() in COMPRESSION_SUFFIXES:
+        name = Path(name).stem
+    return Path(name).stem
+
+def import_zstandard():
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("讀取 .zst 需要安裝 zstandard (pip install zstandard)") from None
+    return zstandard
+
+def import_py7zr():
+    try:
+        import py7zr
+    except ImportError:
+        raise ImportError("讀取 .7z 需要安裝 py7zr (pip install py7zr)") from None
+    return py7zr
+
+class SevenZipStream:
+    """py7zr 在背景 thread 解壓時寫入的對象 (Py7zIO 介面)，也是解析端讀取的 stream
+
+    每個成員的內容以小塊放進共用的佇列，佇列滿時解壓會暫停，記憶體只保留佇列內的資料。
+    """
+
+    def __init__(self, events, stopped, name=None):
+        self.events = events
+        self.stopped = stopped
+        self.name = name
+        self.next_event = None
+
+    # --- py7zr 端 (WriterFactory / Py7zIO) ---
+    def put(self, event):
+        while not self.stopped.is_set():
+            try:
+                self.events.put(event, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+        raise InterruptedError("已停止讀取 .7z")
+
+    def create(self, filename):
+        self.put(("start", filename))
+        return SevenZipStream(self.events, self.stopped, filename)
+
+    def write(self, data):
+        self.put(("data", bytes(data)))
+        return len(data)
+
+    def seekable(self):
+        return False
+
+    def seek(self, offset, whence=0):
+        return 0
+
+    def flush(self):
+        pass
+
+    def size(self):
+        return 0
+
+    def close(self):
+        pass
+
+    # --- 解析端 ---
+    def read(self, size=-1):
+        """讀取這個成員最多 size bytes，成員結束時回傳 b"" """
+        chunks = []
+        length = 0
+        while self.next_event is None and (size < 0 or length < size):
+            event = self.events.get()
+            if event[0] == "data":
+                chunks.append(event[1])
+                length += len(event[1])
+            elif event[0] == "error":
+                raise event[1]
+            else:
+                # 下一個成員開始或全部結束
+                self.next_event = event
+        return b"".join(chunks)
+
+    def drain(self):
+        """略過這個成員剩下的內容，回傳下一個事件"""
+        while self.next_event is None:
+            self.read(SCAN_BLOCK_SIZE)
+        return self.next_event
+
+def iter_7z_streams(filepath):
+    py7zr = import_py7zr()
+    events = queue.Queue(maxsize=64)
+    stopped = threading.Event()
+    factory = SevenZipStream(events, stopped)
+
+    def extract():
+        try:
+            with py7zr.SevenZipFile(filepath) as archive:
+                targets = [name for name in archive.getnames() if name.lower().endswith(".txt")]
+                archive.extract(targets=targets, factory=factory)
+            factory.put(("done",))
+        except InterruptedError:
+            pass
+        except Exception as e:
+            factory.put(("error", e))
+
+    thread = threading.Thread(target=extract, daemon=True)
+    thread.start()
+    try:
+        event = events.get()
+        while event[0] != "done":
+            if event[0] == "error":
+                raise event[1]
+            if event[0] == "start":
+                stream = SevenZipStream(events, stopped, event[1])
+                yield f"{filepath}/{event[1]}", stream
+                event = stream.drain()
+            else:
+                event = events.get()
+    finally:
+        stopped.set()
+        thread.join()
+
+def iter_input_streams(filepath):
+    """依序產生 (名稱, 解壓後的 binary stream)；.zip / .7z 內每個 TXT 成員各一個
+
+    下一個 stream 要在前一個讀完 (或不再使用) 後才能取得。
+    """
+    kind = compression_type(filepath)
+    if kind == "gz":
+        # 多個 gzip member 串接的檔案也會依序讀出
+        with gzip.open(filepath, 'rb') as stream:
+            yield filepath, stream
+    elif kind == "zst":
+        zstandard = import_zstandard()
+        with open(filepath, 'rb') as f, \
+                zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True) as stream:
+            yield filepath, stream
+    elif kind == "zip":
+        with zipfile.ZipFile(filepath) as archive:
+            for info in archive.infolist():
+                if not info.is_dir() and info.filename.lower().endswith(".txt"):
+                    with archive.open(info) as stream:
+                        yield f"{filepath}/{info.filename}", stream
+    elif kind == "7z":
+        yield from iter_7z_streams(filepath)
+    else:
+        with open(filepath, 'rb') as stream:
+            yield filepath, stream
+
+def iter_extract_data(filepath, shards=1, columns=None, min_shard_size=MIN_SHARD_SIZE, errors=DECODE_ERRORS,
+                      rules=None):
+    """以 mmap 在 bytes 上掃描，只解碼可能有用的行；非 UTF-8 位元組依 errors 處理
+
+    shards > 1 時依 Item 邊界切段，交給多個 process 解析後依原順序串接；同時在處理中的段數有上限，
+    shards 設得比 CPU 多時每段較小，主程序佔用的記憶體也較少。
+    壓縮檔 (.gz / .zst / .7z / .zip) 邊解壓邊解析，不切段；壓縮檔內有多個 TXT 時依序串接，
+    每個 TXT 各自從頭解析。
+    """
+    pattern = candidate_line_pattern((rules or DEFAULT_RULES).line_keywords)
+    if compression_type(filepath) is not None:
+        for _, stream in iter_input_streams(filepath):
+            yield from iter_lines_data(iter_stream_lines(stream, errors, pattern), columns, rules)
+        return
+
+    ranges = find_shard_ranges(filepath, shards, min_shard_size) if shards > 1 else []
+    if len(ranges) <= 1:
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                # 空檔案無法 mmap
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                yield from iter_lines_data(iter_candidate_lines(mm, errors=errors, pattern=pattern), columns, rules)
+        return
+
+    # 同時最多 jobs * 2 段在解析或等待輸出，行數多的檔案不會整份堆在主程序記憶體
+    jobs = min(len(ranges), os.cpu_count() or 1)
+    pending = iter(ranges)
+    in_flight = deque()
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        while True:
+            for start, end in islice(pending, jobs * 2 - len(in_flight)):
+                in_flight.append(pool.submit(parse_shard, filepath, start, end, columns, errors, rules))
+            if not in_flight:
+                break
+            yield from in_flight.popleft().result()
+
+def extract_data(filepath, shards=1, columns=None, errors=DECODE_ERRORS, rules=None):
+    return list(iter_extract_data(filepath, shards, columns, errors=errors, rules=rules))
+
+# typed 輸出時轉成數值的欄位 -> 標準單位 (秒 / 伏特 / 安培；"" 為沒有單位的座標)
+NUMERIC_UNITS = {
+    "Vcc": "V", "Vhh": "V", "Vih": "V", "Gate": "V", "Drain": "V",
+    "ICC1": "A", "ICC1_POR": "A", "ICC2": "A", "ICC3": "A", "I": "A",
+    "Tspec": "s", "T": "s", "Twp": "s", "Tbusy": "s", "Twc": "s", "Terase": "s",
+    "X": "", "Y": "", "X1": "", "X2": "",
+}
+# 秒 / 伏特 / 安培只會用到 1 以下的前綴；log 的單位大小寫不拘 (1.5MS 也是毫秒)，所以前綴不分大小寫，
+# k / M / G 不接受 (放到 <欄位>_raw)
+UNIT_PREFIXES = {"": 1.0, "p": 1e-12, "n": 1e-9, "u": 1e-6, "\u00b5": 1e-6, "m": 1e-3}
+NUMBER_PATTERN = re.compile(r"([+-]?(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?)\s*(\S*)")
+HEX_PATTERN = re.compile(r"[+-]?0[xX][0-9a-fA-F]+")
+
+@lru_cache(maxsize=65536)
+def parse_number(value, unit):
+    """把 "1.5mS"、"1.2uA"、"3.3" 這類字串換成標準單位的 float；無法轉換時回傳 None
+
+    單位與前綴大小寫都不拘 (和 T=...mS 的比對方式一致，1.5MS 也是毫秒)，單位也可以省略。
+    沒有單位的欄位 (座標) 也接受 0x 開頭的十六進位。
+    """
+    value = value.strip()
+    if not unit and HEX_PATTERN.fullmatch(value):
+        return float(int(value, 16))
+    match = NUMBER_PATTERN.fullmatch(value)
+    if not match:
+        return None
+    suffix = match.group(2)
+    if not unit:
+        return float(match.group(1)) if not suffix else None
+    if suffix[-1:].lower() == unit.lower():
+        suffix = suffix[:-1]
+    scale = UNIT_PREFIXES.get(suffix.lower())
+    if scale is None:
+        return None
+    return float(match.group(1)) * scale
+
+def typed_headers(columns=None):
+    """typed 輸出的欄位名稱：每個數值欄位後面多一欄 <欄位>_raw"""
+    headers = []
+    for header in columns or HEADERS:
+        headers.append(header)
+        if header in NUMERIC_UNITS:
+            headers.append(header + "_raw")
+    return headers
+
+def typed_values(values, columns=None):
+    """把 row_values 的結果轉成 typed_headers 的順序：數值欄位為 float (空白或無法轉換為 None)，
+    <欄位>_raw 只保留無法轉換的原字串"""
+    typed = []
+    for header, value in zip(columns or HEADERS, values):
+        unit = NUMERIC_UNITS.get(header)
+        if unit is None:
+            typed.append(value)
+            continue
+        number = parse_number(value, unit) if value else None
+        typed.append(number)
+        typed.append(value if number is None and value else None)
+    return typed
+
+# 合併輸出時記錄來源檔的欄位
+SOURCE_HEADER = "Source"
+
+def output_headers(columns, typed=False, source=False):
+    headers = typed_headers(columns) if typed else list(columns)
+    return [SOURCE_HEADER] + headers if source else headers
+
+def append_sheet_rows(ws, data, columns, typed=False, source=False):
+    # 空字串讀回本來就是空儲存格，直接略過不寫
+    count = 0
+    for batch in iter_batches(data, columns=columns, typed=typed, source=source):
+        for values in batch:
+            ws.append([None if value == "" else value for value in values])
+        count += len(batch)
+    return count
+
+def save_to_excel(data, save_path, columns=None, typed=False, source=False):
+    """以 write-only 模式逐列寫入，data 可以是 list 或 iter_extract_data 的 generator；回傳寫入筆數"""
+    columns = select_columns(columns)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Extracted Data")
 
     # 設定標題列
-    for col, header in enumerate(HEADERS, start=1):
-        ws[f"{get_column_letter(col)}1"] = header
+    ws.append(output_headers(columns, typed, source))
+    count = append_sheet_rows(ws, data, columns, typed, source)
+
+    wb.save(save_path)
+    return count
 
-    # 寫入資料
-    for row_idx, row_data in enumerate(data, start=2):
-        for col_idx, header in enumerate(HEADERS, start=1):
-            ws[f"{get_column_letter(col_idx)}{row_idx}"] = row_data.get(header, "")
+def sheet_title(filepath, used):
+    """以來源檔名當工作表名稱：去掉 Excel 不允許的字元、最多 31 字，重複時加上序號"""
+    base = re.sub(r"[\[\]:*?/\\]", "_", input_stem(filepath))[:31] or "Sheet"
+    title = base
+    n = 1
+    while title.lower() in used:
+        suffix = f"_{n}"
+        title = base[:31 - len(suffix)] + suffix
+        n += 1
+    used.add(title.lower())
+    return title
 
+def save_to_excel_sheets(parts, save_path, columns=None, typed=False):
+    """parts 為 (來源檔, 資料列) 的序列，每個來源檔寫成一個工作表；回傳寫入筆數"""
+    columns = select_columns(columns)
+    wb = Workbook(write_only=True)
+    used = set()
+    count = 0
+    for filepath, rows in parts:
+        ws = wb.create_sheet(sheet_title(filepath, used))
+        ws.append(output_headers(columns, typed))
+        count += append_sheet_rows(ws, rows, columns, typed)
+    if not used:
+        wb.create_sheet("Extracted Data").append(output_headers(columns, typed))
     wb.save(save_path)
+    return count
 
-class MainApplication(tk.Tk):
-    def __init__(self):
-        super().__init__()
-        self.title("CP Rawdata 轉換工具")
-        self.configure(bg="#1e1e1e")  # Dark background
-        self.minsize(550, 300)
-        self.geometry("550x300")
-        
-        # Set icon (would be replaced with actual file in production)
-        # self.iconbitmap("icon.ico")  # For Windows
-        # self.iconphoto(True, tk.PhotoImage(file="icon.png"))  # For Linux/macOS
-        
-        # Set system font
-        self.system_font = font.nametofont("TkDefaultFont")
-        self.system_font.configure(family="SF Pro Text", size=12)
-        
-        # Setting ttk style
-        self.style = ttk.Style()
-        self.style.theme_use('default')
-        self.style.configure("TProgressbar", thickness=6, background='#0066cc')
-        
-        self.create_widgets()
-        self.center_window()
-        self.current_file = None
-        
-    def create_widgets(self):
-        # Main frame with padding
-        main_frame = tk.Frame(self, bg="#1e1e1e", padx=20, pady=20)
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Header Frame
-        header_frame = tk.Frame(main_frame, bg="#1e1e1e")
-        header_frame.pack(fill=tk.X, pady=(0, 15))
-        
-        # Title with SF Pro Display font
-        title_label = tk.Label(header_frame, text="CP Rawdata 擷取器", 
-                               font=("SF Pro Display", 18, "bold"), 
-                               bg="#1e1e1e", fg="#ffffff")
-        title_label.pack(side=tk.LEFT)
-        
-        # Information icon with tooltip
-        info_frame = tk.Frame(header_frame, bg="#1e1e1e")
-        info_frame.pack(side=tk.RIGHT, padx=5)
-        
-        info_label = tk.Label(info_frame, text="ⓘ", font=("SF Pro Text", 14), 
-                             bg="#1e1e1e", fg="#4a90e2", cursor="hand2")
-        info_label.pack()
-        
-        # Tooltip for info button
-        TooltipBase(info_label, "格式範例：\n############ Item文字 ############\nDetail名稱(參數1=值1, 參數2=值2...)")
-        
-        # File selection frame
-        file_frame = tk.Frame(main_frame, bg="#1e1e1e")
-        file_frame.pack(fill=tk.X, pady=10)
-        
-        # File path display with ellipsis for long paths
-        self.file_var = tk.StringVar()
-        self.file_var.set("尚未選擇檔案")
-        
-        file_label = tk.Label(file_frame, text="檔案路徑:", bg="#1e1e1e", fg="#e0e0e0", 
-                             font=("SF Pro Text", 12))
-        file_label.pack(side=tk.LEFT, padx=(0, 5))
-        
-        self.path_label = tk.Label(file_frame, textvariable=self.file_var, bg="#1e1e1e", 
-                                  fg="#cccccc", anchor="w", width=40, font=("SF Pro Text", 12))
-        self.path_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        
-        # Button frame
-        button_frame = tk.Frame(main_frame, bg="#1e1e1e")
-        button_frame.pack(fill=tk.X, pady=20)
-        
-        # Open file button
-        self.open_button = MacOSButton(button_frame, text="選擇 TXT 檔案", command=self.select_file,
-                                      width=150, height=34, bg="#333333", hover_color="#404040")
-        self.open_button.pack(side=tk.LEFT, padx=(0, 10))
-        
-        # Export button
-        self.export_button = MacOSButton(button_frame, text="匯出 Excel", command=self.export_excel,
-                                        width=150, height=34, bg="#0066cc", hover_color="#0077ee")
-        self.export_button.pack(side=tk.LEFT)
-        self.export_button.configure(state=tk.DISABLED)  # Initially disabled
-        
-        # Status frame at the bottom
-        status_frame = tk.Frame(main_frame, bg="#252525", bd=0, height=30)
-        status_frame.pack(fill=tk.X, side=tk.BOTTOM, pady=(20, 0))
-        
-        self.status_var = tk.StringVar()
-        self.status_var.set("準備就緒")
-        
-        status_label = tk.Label(status_frame, textvariable=self.status_var, bg="#252525", 
-                               fg="#a0a0a0", anchor="w", padx=10, pady=5, font=("SF Pro Text", 10))
-        status_label.pack(fill=tk.X)
-
-    def center_window(self):
-        """Center the window on the screen"""
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f'{width}x{height}+{x}+{y}')
-    
-    def select_file(self):
-        filepath = filedialog.askopenfilename(
-            title="選擇 TXT 檔案",
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")],
-            initialdir=os.path.expanduser("~/Documents")  # Default to Documents folder
-        )
-        
-        if not filepath:
+# CSV / Parquet / Arrow 每批寫入的筆數
+EXPORT_BATCH_SIZE = 10000
+
+def iter_batches(data, batch_size=EXPORT_BATCH_SIZE, columns=None, typed=False, source=False):
+    """把資料切成每批 batch_size 列，每列為依 columns (預設 HEADERS) 順序的值 list；
+    typed=True 時改為 typed_headers 的順序；source=True 時 data 為 (來源, 資料列)，來源放在第一欄"""
+    rows = iter(data)
+    while True:
+        if source:
+            pairs = list(islice(rows, batch_size))
+            sources = [name for name, _ in pairs]
+            batch = [row_values(row_data, columns) for _, row_data in pairs]
+        else:
+            batch = [row_values(row_data, columns) for row_data in islice(rows, batch_size)]
+        if not batch:
             return
-            
-        # Update file path display with ellipsis for long paths
-        if len(filepath) > 40:
-            display_path = filepath[:18] + "..." + filepath[-19:]
+        if typed:
+            batch = [typed_values(values, columns) for values in batch]
+        if source:
+            batch = [[name] + values for name, values in zip(sources, batch)]
+        yield batch
+
+def import_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise ImportError("typed 陣列需要安裝 numpy (pip install numpy)") from None
+    return numpy
+
+def to_arrays(data, columns=None):
+    """把資料列轉成 {欄位: NumPy 陣列}：數值欄位為標準單位的 float64 (空白或無法轉換為 NaN)，
+    其餘欄位與 <欄位>_raw 為 object 陣列，可直接做整批 lot 的統計"""
+    np = import_numpy()
+    columns = select_columns(columns)
+    headers = typed_headers(columns)
+    values = [[] for _ in headers]
+    for batch in iter_batches(data, columns=columns, typed=True):
+        for column, column_values in zip(values, zip(*batch)):
+            column.extend(column_values)
+    return {header: np.array(column, dtype=np.float64 if header in NUMERIC_UNITS else object)
+            for header, column in zip(headers, values)}
+
+def to_dataframe(data, columns=None):
+    """與 to_arrays 相同，但回傳 pandas DataFrame"""
+    try:
+        import pandas
+    except ImportError:
+        raise ImportError("DataFrame 需要安裝 pandas (pip install pandas)") from None
+    return pandas.DataFrame(to_arrays(data, columns))
+
+def save_to_csv(data, save_path, columns=None, typed=False, source=False):
+    # utf-8-sig 讓 Excel 直接開啟時中文不會亂碼，pandas 也能正常讀取
+    columns = select_columns(columns)
+    count = 0
+    with open(save_path, 'w', encoding='utf-8-sig', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(output_headers(columns, typed, source))
+        for batch in iter_batches(data, columns=columns, typed=typed, source=source):
+            writer.writerows(batch)
+            count += len(batch)
+    return count
+
+def import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError:
+        raise ImportError("輸出 Parquet / Arrow 需要安裝 pyarrow (pip install pyarrow)") from None
+    return pyarrow
+
+def arrow_schema(pa, columns, typed=False, source=False):
+    return pa.schema([(header, pa.float64() if typed and header in NUMERIC_UNITS else pa.string())
+                      for header in output_headers(columns, typed, source)])
+
+def iter_record_batches(pa, schema, data, columns=None, typed=False, source=False):
+    for batch in iter_batches(data, columns=columns or schema.names, typed=typed, source=source):
+        # 空字串存成 null，與 Excel 空白儲存格一致
+        arrays = [pa.array([row[i] or None for row in batch], pa.string()) if field.type == pa.string()
+                  else pa.array([row[i] for row in batch], field.type)
+                  for i, field in enumerate(schema)]
+        yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def save_to_parquet(data, save_path, columns=None, typed=False, source=False):
+    pa = import_pyarrow()
+    import pyarrow.parquet as pq
+
+    count = 0
+    columns = select_columns(columns)
+    schema = arrow_schema(pa, columns, typed, source)
+    with pq.ParquetWriter(save_path, schema) as writer:
+        for batch in iter_record_batches(pa, schema, data, columns, typed, source):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+def save_to_arrow(data, save_path, columns=None, typed=False, source=False):
+    pa = import_pyarrow()
+
+    count = 0
+    columns = select_columns(columns)
+    schema = arrow_schema(pa, columns, typed, source)
+    with pa.OSFile(str(save_path), 'wb') as sink, pa.ipc.new_file(sink, schema) as writer:
+        for batch in iter_record_batches(pa, schema, data, columns, typed, source):
+            writer.write_batch(batch)
+            count += batch.num_rows
+    return count
+
+# 副檔名 -> 輸出函式
+EXPORTERS = {
+    ".xlsx": save_to_excel,
+    ".csv": save_to_csv,
+    ".parquet": save_to_parquet,
+    ".arrow": save_to_arrow,
+    ".feather": save_to_arrow,
+}
+
+def save_data(data, save_path, fmt=None, columns=None, typed=False, source=False):
+    """依 fmt (例如 "csv") 或 save_path 副檔名選擇輸出格式；回傳寫入筆數
+
+    columns 指定只輸出部分欄位 (Item / Detail 一律保留)。
+    typed=True 時數值欄位 (NUMERIC_UNITS) 換成標準單位的數字，無法轉換的原字串放在 <欄位>_raw。
+    source=True 時 data 為 (來源, 資料列)，輸出多一欄 Source。
+    """
+    ext = "." + fmt.lower().lstrip(".") if fmt else Path(save_path).suffix.lower()
+    if ext not in EXPORTERS:
+        raise ValueError(f"不支援的輸出格式：{ext or save_path}，可用格式：{', '.join(EXPORTERS)}")
+    return EXPORTERS[ext](data, save_path, columns, typed, source)
+
+# 解析規則或 Row 格式改變時要更新，舊版本的快取就不會再被使用
+PARSER_VERSION = "1"
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".rawdata_extract_cache")
+CACHE_MAX_BYTES = 1024 * 1024 * 1024
+
+def file_digest(filepath, chunk_size=1024 * 1024):
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ResultCache:
+    """以檔案內容 hash + PARSER_VERSION 為 key 保存解析結果
+
+    快取檔放在 cache_dir，總大小超過 max_bytes 時刪除最久沒用到的項目 (LRU)。
+    hits / misses 為這次執行的統計，save_stats() 會累加到 stats.json。
+    """
+    STATS_FILE = "stats.json"
+
+    def __init__(self, cache_dir=CACHE_DIR, max_bytes=CACHE_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def entry_path(self, filepath, columns=None, rules=None):
+        name = f"{file_digest(filepath)}-v{PARSER_VERSION}"
+        if columns:
+            # 只擷取部分欄位的結果與完整結果分開存
+            name += "-" + hashlib.sha256(",".join(select_columns(columns)).encode("utf-8")).hexdigest()[:12]
+        if rules is not None and rules.fingerprint() != DEFAULT_RULES.fingerprint():
+            name += "-r" + rules.fingerprint()
+        return os.path.join(self.cache_dir, name + ".rows")
+
+    def iter_rows(self, filepath, shards=1, columns=None, rules=None):
+        """回傳 (rows, hit)；命中時直接讀出快取，不會呼叫 extract_data，未命中時一邊解析一邊寫入快取"""
+        path = self.entry_path(filepath, columns, rules)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            self.misses += 1
+            return self.iter_store(path, iter_extract_data(filepath, shards, columns, rules=rules)), False
+        self.hits += 1
+        # 更新修改時間，作為 LRU 的使用時間
+        os.utime(path)
+        return self.iter_entry(f), True
+
+    def iter_entry(self, f):
+        with f:
+            while True:
+                try:
+                    batch = pickle.load(f)
+                except EOFError:
+                    return
+                for item, detail, fields in batch:
+                    yield Row(sys.intern(item), sys.intern(detail), fields)
+
+    def iter_store(self, path, rows):
+        # 先寫到暫存檔，完整解析完才換成正式檔名，中途失敗不會留下不完整的快取
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                batch = []
+                for row in rows:
+                    batch.append((row.item, row.detail, row.fields))
+                    if len(batch) >= EXPORT_BATCH_SIZE:
+                        pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+                        batch = []
+                    yield row
+                if batch:
+                    pickle.dump(batch, f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self.evict()
+
+    def entries(self):
+        """回傳 [(使用時間, 大小, 路徑)]，依使用時間由舊到新排序"""
+        entries = []
+        for entry in os.scandir(self.cache_dir):
+            if entry.name.endswith(".rows"):
+                st = entry.stat()
+                entries.append((st.st_mtime, st.st_size, entry.path))
+        return sorted(entries)
+
+    def evict(self):
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def clear(self):
+        for _, _, path in self.entries():
+            os.remove(path)
+
+    def load_stats(self):
+        try:
+            with open(os.path.join(self.cache_dir, self.STATS_FILE), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"hits": 0, "misses": 0}
+
+    def save_stats(self):
+        saved = self.load_stats()
+        saved["hits"] = saved.get("hits", 0) + self.hits
+        saved["misses"] = saved.get("misses", 0) + self.misses
+        stats_path = os.path.join(self.cache_dir, self.STATS_FILE)
+        with open(stats_path + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(saved, f)
+        os.replace(stats_path + ".tmp", stats_path)
+        self.hits = self.misses = 0
+
+    def stats(self):
+        """累計的命中統計 (含尚未儲存的部分) 與目前快取大小"""
+        saved = self.load_stats()
+        hits = saved.get("hits", 0) + self.hits
+        misses = saved.get("misses", 0) + self.misses
+        entries = self.entries()
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+# 文字模式 (universal newlines) 下的換行符號
+NEWLINE_PATTERN = re.compile(rb"\r\n|\r|\n")
+# 用來確認來源檔沒有被換掉的檔頭長度
+TAIL_HEAD_BYTES = 4096
+
+def split_raw_lines(raw, offset):
+    """把以 binary 讀到、\n 結尾的一行依文字模式的換行規則拆開，回傳 [(byte offset, bytes 行)]
+
+    offset 在 bytes 上計算，不受解碼時不合法位元組換成 U+FFFD 影響；每行結尾統一為 \n。
+    """
+    if b"\r" not in raw:
+        return [(offset, raw)]
+    lines = []
+    start = 0
+    for m in NEWLINE_PATTERN.finditer(raw):
+        lines.append((offset + start, raw[start:m.start()] + b"\n"))
+        start = m.end()
+    if start < len(raw):
+        # 檔尾沒有換行的最後一行 (final=True 時)
+        lines.append((offset + start, raw[start:]))
+    return lines
+
+def iter_tail_data(filepath, state, final=False, columns=None, rules=None):
+    """從 state["offset"] 繼續解析仍在寫入中的檔案，只產生上次之後新增的資料列
+
+    state["offset"] 指向最後一個尚未結束的 Item 標題列，state["emitted"] 為該 Item
+    已輸出的筆數。檔尾不完整的一行不處理；最後一個 Item 要等下一個 Item 出現才算結束，
+    所以「沒有 Detail」的那一列會留到下次 (或 final=True) 才輸出。解析完後更新 state。
+    """
+    lookup = keyword_lookup(columns)
+    parse = (rules or DEFAULT_RULES).parse
+    offset = state.get("offset", 0)
+    skip = state.get("emitted", 0)
+    base_item = None
+    item_offset = offset
+    item_rows = 0
+    found = False
+    done = False
+
+    pos = offset
+    with open(filepath, 'rb') as f:
+        f.seek(offset)
+        for raw in f:
+            if not raw.endswith(b"\n") and not final:
+                # 測試機還在寫這一行
+                break
+            for line_offset, line in split_raw_lines(raw, pos):
+                line = line.decode("utf-8", DECODE_ERRORS)
+                if base_item is None:
+                    match = ITEM_PATTERN.match(line.strip())
+                    if not match:
+                        continue
+                else:
+                    match = ITEM_PATTERN.match(line)
+                    if not match:
+                        if done:
+                            continue
+                        row_data, is_param = parse(base_item, line.strip().rstrip("."), lookup)
+                        if row_data is not None:
+                            item_rows += 1
+                            if skip:
+                                skip -= 1
+                            else:
+                                yield row_data
+                            found = True
+                            done = is_param
+                        continue
+                    if not found:
+                        yield Row(base_item)
+                    # 上次輸出到一半的 Item 已經結束
+                    skip = 0
+                    match = ITEM_PATTERN.match(line.strip())
+
+                base_item = sys.intern(match.group(1).strip())
+                item_offset = line_offset
+                item_rows = 0
+                found = False
+                done = False
+            pos += len(raw)
+
+    if final and base_item is not None and not found:
+        yield Row(base_item)
+    state["offset"] = item_offset if base_item is not None else pos
+    state["emitted"] = item_rows
+
+def append_data(data, save_path, columns=None):
+    """把資料列接在既有輸出檔後面 (csv / xlsx)；檔案不存在時建立新檔；回傳寫入筆數
+
+    xlsx 每次都要讀入並重存整本活頁簿，耗時隨已輸出的總筆數增加；長時間追蹤大檔請用 csv。
+    """
+    if not os.path.exists(save_path):
+        return save_data(data, save_path, columns=columns)
+
+    columns = select_columns(columns)
+    ext = Path(save_path).suffix.lower()
+    count = 0
+    if ext == ".csv":
+        with open(save_path, 'a', encoding='utf-8', newline='') as f:
+            writer = csv.writer(f)
+            for batch in iter_batches(data, columns=columns):
+                writer.writerows(batch)
+                count += len(batch)
+    elif ext == ".xlsx":
+        wb = load_workbook(save_path)
+        if "Extracted Data" not in wb.sheetnames:
+            raise ValueError(f"{save_path} 沒有 \"Extracted Data\" 工作表，無法接續輸出")
+        ws = wb["Extracted Data"]
+        for row_data in data:
+            ws.append([value or None for value in row_values(row_data, columns)])
+            count += 1
+        wb.save(save_path)
+    else:
+        raise ValueError(f"增量輸出只支援 .csv / .xlsx：{save_path}")
+    return count
+
+def head_digest(filepath, size=TAIL_HEAD_BYTES):
+    with open(filepath, 'rb') as f:
+        return hashlib.sha256(f.read(size)).hexdigest()
+
+def load_tail_state(filepath, save_path, columns=None, rules=None):
+    """讀取輸出檔旁的 .tail.json；來源檔被換掉、變短、解析版本或欄位不同時回傳 None (需從頭開始)"""
+    try:
+        with open(save_path + ".tail.json", 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (
+        state.get("source") != os.path.abspath(filepath)
+        or state.get("parser_version") != PARSER_VERSION
+        or state.get("columns", HEADERS) != select_columns(columns)
+        or state.get("rules", DEFAULT_RULES.fingerprint()) != (rules or DEFAULT_RULES).fingerprint()
+        or not os.path.exists(save_path)
+        or os.path.getsize(filepath) < state.get("size", 0)
+        or head_digest(filepath, state.get("head_size", 0)) != state.get("head_digest")
+    ):
+        return None
+    return state
+
+def extract_tail(filepath, save_path, final=False, columns=None, rules=None):
+    """增量擷取：接續上次的位置，只把新增的資料列接到 save_path；回傳 (新增筆數, 是否從頭開始)
+
+    final=True 表示檔案已寫完，最後一個 Item 也一併輸出，並刪除 .tail.json。
+    """
+    if compression_type(filepath) is not None:
+        raise ValueError("tail 只支援未壓縮的 TXT 檔")
+    state = load_tail_state(filepath, save_path, columns, rules)
+    restart = state is None
+    if restart:
+        state = {"offset": 0, "emitted": 0}
+        if os.path.exists(save_path):
+            os.remove(save_path)
+
+    rows = iter_tail_data(filepath, state, final, columns, rules)
+    count = append_data(rows, save_path, columns)
+
+    state_path = save_path + ".tail.json"
+    if final:
+        if os.path.exists(state_path):
+            os.remove(state_path)
+        return count, restart
+
+    size = os.path.getsize(filepath)
+    state.update({
+        "source": os.path.abspath(filepath),
+        "parser_version": PARSER_VERSION,
+        "columns": select_columns(columns),
+        "rules": (rules or DEFAULT_RULES).fingerprint(),
+        "size": size,
+        "head_size": min(size, TAIL_HEAD_BYTES),
+        "head_digest": head_digest(filepath, min(size, TAIL_HEAD_BYTES)),
+        "rows": (0 if restart else state.get("rows", 0)) + count,
+    })
+    with open(state_path + ".tmp", 'w', encoding='utf-8') as f:
+        json.dump(state, f, ensure_ascii=False, indent=2)
+    os.replace(state_path + ".tmp", state_path)
+    return count, restart
+
+DIFF_HEADERS = ["Change", "Item", "Detail", "Occurrence", "Field", "Old", "New"]
+
+def iter_keyed_rows(rows):
+    """為每一列加上 (Item, Detail, 第幾次出現) 的 key，同一 Item 重複的 Detail 依出現順序對應"""
+    seen = {}
+    for row in rows:
+        name = (row.item, row.detail)
+        occurrence = seen.get(name, 0) + 1
+        seen[name] = occurrence
+        yield (row.item, row.detail, occurrence), row
+
+def describe_fields(row):
+    return "; ".join(f"{HEADERS[row.fields[i]]}={row.fields[i + 1]}" for i in range(0, len(row.fields), 2))
+
+def iter_diff(old_rows, new_rows):
+    """比對兩次擷取結果，依 (Item, Detail, 第幾次出現) 對齊，只產生有差異的部分
+
+    舊檔的資料列放進 dict，新檔邊讀邊比對，時間與資料列數成線性。
+    產生 [Change, Item, Detail, Occurrence, Field, Old, New]：changed 每個不同的欄位一列，
+    added / removed 每筆資料一列，Old / New 為該列所有參數。
+    """
+    old = dict(iter_keyed_rows(old_rows))
+    for key, row in iter_keyed_rows(new_rows):
+        old_row = old.pop(key, None)
+        if old_row is None:
+            yield ["added", *key, "", "", describe_fields(row)]
+        elif old_row.fields != row.fields:
+            old_values = dict(zip(old_row.fields[::2], old_row.fields[1::2]))
+            new_values = dict(zip(row.fields[::2], row.fields[1::2]))
+            for index in sorted(old_values.keys() | new_values.keys()):
+                if old_values.get(index, "") != new_values.get(index, ""):
+                    yield ["changed", *key, HEADERS[index], old_values.get(index, ""), new_values.get(index, "")]
+    for key, row in old.items():
+        yield ["removed", *key, "", describe_fields(row), ""]
+
+def save_diff(changes, save_path):
+    """把 iter_diff 的結果寫成 csv 或 xlsx；回傳 {change: 筆數}"""
+    counts = {"added": 0, "removed": 0, "changed": 0}
+    ext = Path(save_path).suffix.lower()
+    if ext == ".csv":
+        with open(save_path, 'w', encoding='utf-8-sig', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(DIFF_HEADERS)
+            for change in changes:
+                writer.writerow(change)
+                counts[change[0]] += 1
+    elif ext == ".xlsx":
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("Diff")
+        ws.append(DIFF_HEADERS)
+        for change in changes:
+            ws.append([value if value != "" else None for value in change])
+            counts[change[0]] += 1
+        wb.save(save_path)
+    else:
+        raise ValueError(f"差異只能輸出成 .csv 或 .xlsx：{save_path}")
+    return counts
+
+def diff_files(old_path, new_path, save_path, shards=1, columns=None, rules=None):
+    """比對兩個 TXT 檔的擷取結果並輸出差異；columns 指定時只比較這些欄位"""
+    return save_diff(iter_diff(iter_extract_data(old_path, shards, columns, rules=rules),
+                               iter_extract_data(new_path, shards, columns, rules=rules)), save_path)
+
+def expand_inputs(patterns, recursive=False):
+    """把檔案、資料夾或萬用字元展開成 TXT 檔清單 (保持順序、去除重複)"""
+    files = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            found = sorted(p for name in INPUT_PATTERNS
+                           for p in glob.glob(os.path.join(pattern, "**" if recursive else "", name), recursive=recursive))
+        elif glob.has_magic(pattern):
+            found = sorted(p for p in glob.glob(pattern, recursive=True) if os.path.isfile(p))
         else:
-            display_path = filepath
-            
-        self.file_var.set(display_path)
-        self.current_file = filepath
-        
-        # Enable export button
-        self.export_button.configure(state=tk.NORMAL)
-        self.status_var.set(f"已載入: {Path(filepath).name}")
-
-    def process_file(self, filepath, save_path, progress_dialog):
+            found = [pattern]
+        files.extend(os.path.abspath(p) for p in found)
+    return list(dict.fromkeys(files))
+
+def output_paths(files, output_dir, fmt):
+    """每個輸入檔對應一個輸出檔；未指定 output_dir 時存在原檔旁邊，同名時加上序號"""
+    paths = []
+    used = set()
+    for filepath in files:
+        folder = Path(output_dir) if output_dir else Path(filepath).parent
+        stem = input_stem(filepath)
+        candidate = folder / f"{stem}.{fmt}"
+        n = 1
+        while candidate in used:
+            candidate = folder / f"{stem}_{n}.{fmt}"
+            n += 1
+        used.add(candidate)
+        paths.append(str(candidate))
+    return paths
+
+def batch_rows(filepath, shards=1, cache=None, columns=None, rules=None):
+    if cache is None:
+        return iter_extract_data(filepath, shards, columns, rules=rules), False
+    return cache.iter_rows(filepath, shards, columns, rules)
+
+def batch_extract_file(filepath, save_path, shards=1, cache=None, columns=None, typed=False, rules=None):
+    start = time.perf_counter()
+    try:
+        rows, hit = batch_rows(filepath, shards, cache, columns, rules)
+        count = save_data(rows, save_path, columns=columns, typed=typed)
+    except Exception:
+        # 不留下寫到一半的輸出檔
+        if os.path.exists(save_path):
+            os.remove(save_path)
+        raise
+    return count, hit, time.perf_counter() - start
+
+def iter_batch_results(pool, func, arg_list):
+    """依輸入順序產生 (args, result, error)；pool 為 None 時在目前 process 依序執行"""
+    if pool is None:
+        for args in arg_list:
+            try:
+                yield args, func(*args), None
+            except Exception as e:
+                yield args, None, e
+        return
+
+    futures = [pool.submit(func, *args) for args in arg_list]
+    for args, future in zip(arg_list, futures):
         try:
-            # Update status
-            progress_dialog.update_status("正在解析檔案...")
-            
-            # Extract data
-            data = extract_data(filepath)
-            
-            if not data:
-                # Close progress dialog before showing error
-                progress_dialog.destroy()
-                MacOSAlert(self, "無結果", "檔案中未找到符合格式的文字。", "warning")
-                return
-            
-            # Update status
-            progress_dialog.update_status("正在儲存到 Excel...")
-            
-            # Save to Excel
-            save_to_excel(data, save_path)
-            
-            # Close progress dialog
-            progress_dialog.destroy()
-            
-            # Show success message
-            success_message = f"已成功擷取 {len(data)} 筆資料並儲存至：\n{Path(save_path).name}"
-            MacOSAlert(self, "完成", success_message, "info")
-            
-            # Update status
-            self.status_var.set(f"已匯出 {len(data)} 筆資料")
-            
+            yield args, future.result(), None
         except Exception as e:
-            # Close progress dialog before showing error
-            progress_dialog.destroy()
-            MacOSAlert(self, "錯誤", str(e), "error")
-            self.status_var.set("處理時發生錯誤")
-
-    def export_excel(self):
-        if not self.current_file:
-            MacOSAlert(self, "注意", "請先選擇一個 TXT 檔案。", "warning")
-            return
-            
-        # Default filename based on input file
-        default_filename = Path(self.current_file).stem + ".xlsx"
-        
-        save_path = filedialog.asksaveasfilename(
-            title="儲存 Excel 檔案",
-            defaultextension=".xlsx", 
-            filetypes=[("Excel files", "*.xlsx")],
-            initialfile=default_filename,
-            initialdir=Path(self.current_file).parent
-        )
-        
-        if not save_path:
+            yield args, None, e
+
+# 合併輸出時暫存檔每批 pickle 的筆數，以及每個 worker 最多先解析完幾個檔案等待寫入
+MERGE_CHUNK_ROWS = 5000
+MERGE_QUEUE_FILES = 4
+
+def spool_rows(rows, spool):
+    """把資料列分批 pickle 寫進 spool (binary 檔案)；回傳筆數"""
+    count = 0
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, MERGE_CHUNK_ROWS))
+        if not chunk:
+            return count
+        pickle.dump(chunk, spool, pickle.HIGHEST_PROTOCOL)
+        count += len(chunk)
+
+def iter_spooled_rows(spool):
+    spool.seek(0)
+    while True:
+        try:
+            chunk = pickle.load(spool)
+        except EOFError:
             return
-            
-        # Show progress dialog
-        progress_dialog = ProgressDialog(self)
-        
-        # Process in a separate thread to keep UI responsive
-        threading.Thread(
-            target=self.process_file, 
-            args=(self.current_file, save_path, progress_dialog),
-            daemon=True
-        ).start()
-
-# Set macOS-style appearance for the application
-def set_macos_appearance():
+        yield from chunk
+
+def merge_worker(files, cache, columns, rules, channel, spool_dir):
+    """合併輸出的解析 process：依序把分配到的檔案完整解析到 spool_dir 內的暫存檔，成功才交給寫入端
+
+    佇列裡只有暫存檔路徑；已有 MERGE_QUEUE_FILES 個檔案等待寫入時，put 會等寫入端讀取。
+    """
+    for filepath in files:
+        fd, spool_path = tempfile.mkstemp(suffix=".rows", dir=spool_dir)
+        try:
+            with os.fdopen(fd, 'wb') as spool:
+                rows, hit = batch_rows(filepath, 1, cache, columns, rules)
+                count = spool_rows(rows, spool)
+        except Exception as e:
+            os.remove(spool_path)
+            channel.put(("error", str(e)))
+        else:
+            channel.put(("end", spool_path, count, hit))
+
+class MergeSources:
+    """依檔案順序產生 (來源檔, 資料列)，交給單一寫入端串流寫出
+
+    每個檔案先完整解析到暫存檔，成功後才交出資料列，失敗的檔案 (在 failed 累計) 不會寫出任何一筆，
+    記憶體用量與 lot 大小無關。
+    jobs > 1 時由最多 jobs 個 worker process 同時解析，第 i 個檔案固定交給第 i % jobs 個 worker，
+    寫入端依檔案順序讀取，所以輸出順序固定；每個 worker 最多領先寫入端 MERGE_QUEUE_FILES 個檔案
+    (暫存在磁碟上)，寫入端較慢時 worker 才會暫停。
+    """
+
+    def __init__(self, files, jobs=1, shards=1, cache=None, columns=None, rules=None):
+        self.files = files
+        self.shards = shards
+        self.cache = cache
+        self.columns = columns
+        self.rules = rules
+        self.failed = 0
+        self.workers = []
+        self.spool_dir = None
+        if shards <= 1 and jobs > 1 and len(files) > 1:
+            workers = min(jobs, len(files))
+            self.spool_dir = tempfile.mkdtemp(prefix="rawdata_merge_")
+            for w in range(workers):
+                channel = multiprocessing.Queue(MERGE_QUEUE_FILES)
+                process = multiprocessing.Process(
+                    target=merge_worker, args=(files[w::workers], cache, columns, rules, channel, self.spool_dir),
+                    daemon=True)
+                process.start()
+                self.workers.append((process, channel))
+
+    def close(self):
+        for process, _ in self.workers:
+            if process.is_alive():
+                process.terminate()
+            process.join()
+        self.workers = []
+        if self.spool_dir is not None:
+            shutil.rmtree(self.spool_dir, ignore_errors=True)
+            self.spool_dir = None
+
+    def __iter__(self):
+        for i, filepath in enumerate(self.files):
+            if self.workers:
+                spooled = self.receive_spool(filepath, *self.workers[i % len(self.workers)])
+            else:
+                spooled = self.local_spool(filepath)
+            if spooled is not None:
+                yield filepath, self.iter_rows(filepath, *spooled)
+
+    def local_spool(self, filepath):
+        """在本 process 解析一個檔案到暫存檔；回傳 (暫存檔, 筆數, 是否命中快取, 暫存檔路徑)，失敗時回傳 None"""
+        spool = tempfile.TemporaryFile()
+        try:
+            rows, hit = batch_rows(filepath, self.shards, self.cache, self.columns, self.rules)
+            count = spool_rows(rows, spool)
+        except Exception as e:
+            spool.close()
+            self.fail(filepath, e)
+            return None
+        return spool, count, hit, None
+
+    def receive_spool(self, filepath, process, channel):
+        """等 worker 解析完這個檔案；回傳值同 local_spool"""
+        message = self.receive(process, channel)
+        if message[0] == "error":
+            self.fail(filepath, message[1])
+            return None
+        _, spool_path, count, hit = message
+        if self.cache is not None:
+            # worker process 裡 cache 的統計不會傳回來，改由這裡累計
+            if hit:
+                self.cache.hits += 1
+            else:
+                self.cache.misses += 1
+        return open(spool_path, 'rb'), count, hit, spool_path
+
+    def iter_rows(self, filepath, spool, count, hit, spool_path):
+        with spool:
+            yield from iter_spooled_rows(spool)
+        if spool_path is not None:
+            os.remove(spool_path)
+        print(f"OK   {filepath} ({count} 筆{', 快取' if hit else ''})")
+
+    def receive(self, process, channel):
+        while True:
+            try:
+                return channel.get(timeout=1)
+            except queue.Empty:
+                if not process.is_alive():
+                    try:
+                        return channel.get(timeout=0.1)
+                    except queue.Empty:
+                        raise RuntimeError("解析 process 意外結束") from None
+
+    def fail(self, filepath, error):
+        self.failed += 1
+        print(f"FAIL {filepath}: {error} (略過，沒有寫入任何資料)", file=sys.stderr)
+
+def run_batch(files, output_dir=None, fmt="xlsx", merge=None, jobs=None, shards=1, cache=None, columns=None,
+              typed=False, source_column=False, sheet_per_file=False, rules=None):
+    """以 process pool 平行處理多個檔案，單一檔案失敗不影響其他檔案；回傳失敗的檔案數
+
+    shards > 1 時改為一次處理一個檔案，由 iter_extract_data 把單一檔案切段平行解析。
+    有 cache 時內容沒變的檔案直接讀取快取結果，命中統計累計在 cache.hits / cache.misses。
+    merge 時由 MergeSources 平行解析、單一寫入端依檔案順序串流寫出；source_column 加上來源檔欄位，
+    sheet_per_file 則每個檔案一個工作表 (僅 .xlsx)。
+    """
+    failed = 0
+    jobs = jobs or os.cpu_count() or 1
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+
+    if merge:
+        sources = MergeSources(files, jobs, shards, cache, columns, rules)
+        try:
+            start = time.perf_counter()
+            if sheet_per_file:
+                count = save_to_excel_sheets(sources, merge, columns, typed)
+            elif source_column:
+                data = ((Path(filepath).name, row) for filepath, rows in sources for row in rows)
+                count = save_data(data, merge, columns=columns, typed=typed, source=True)
+            else:
+                count = save_data((row for _, rows in sources for row in rows), merge, columns=columns, typed=typed)
+        finally:
+            sources.close()
+        print(f"已合併 {len(files) - sources.failed} 個檔案，共 {count} 筆資料 -> {merge} ({time.perf_counter() - start:.2f}s)")
+        return sources.failed
+
+    pool = None
+    if shards <= 1 and jobs > 1 and len(files) > 1:
+        pool = ProcessPoolExecutor(max_workers=min(jobs, len(files)))
+
+    def count_hit(hit):
+        # worker process 裡 cache 的統計不會傳回來，改由主程式依結果累計
+        if pool is not None and cache is not None:
+            if hit:
+                cache.hits += 1
+            else:
+                cache.misses += 1
+
     try:
-        # For macOS
-        import platform
-        if platform.system() == 'Darwin':
-            os.system('''defaults write -g NSRequiresAquaSystemAppearance -bool YES''')
-            from tkmacosx import ColorVar, ColorscaleVar
-    except:
-        pass
+        arg_list = [(filepath, save_path, shards, cache, columns, typed, rules)
+                    for filepath, save_path in zip(files, output_paths(files, output_dir, fmt))]
+        for (filepath, save_path, *_), result, error in iter_batch_results(pool, batch_extract_file, arg_list):
+            if error is not None:
+                failed += 1
+                print(f"FAIL {filepath}: {error}", file=sys.stderr)
+                continue
+            count, hit, elapsed = result
+            count_hit(hit)
+            print(f"OK   {filepath} -> {save_path} ({count} 筆, {elapsed:.2f}s{', 快取' if hit else ''})")
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="CP Rawdata 轉換工具 (命令列模式，不需要圖形介面)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("batch", help="批次轉換多個 TXT 檔")
+    p.add_argument("inputs", nargs="+", help="TXT 檔 (也可以是 .gz / .zst / .7z / .zip)、資料夾或萬用字元 (例如 logs/*.txt)")
+    p.add_argument("-r", "--recursive", action="store_true", help="資料夾內包含子資料夾")
+    p.add_argument("-o", "--output-dir", help="輸出資料夾 (預設存在原檔旁邊)")
+    p.add_argument("-f", "--format", default="xlsx", choices=[ext.lstrip(".") for ext in EXPORTERS],
+                   help="每個檔案的輸出格式 (預設 xlsx)")
+    p.add_argument("-m", "--merge", metavar="FILE", help="全部合併輸出成單一檔案，格式依副檔名決定")
+    p.add_argument("--source-column", action="store_true", help="合併時加上 Source 欄位記錄來源檔名")
+    p.add_argument("--sheet-per-file", action="store_true", help="合併成 .xlsx 時每個來源檔一個工作表")
+    p.add_argument("-j", "--jobs", type=int, help="同時處理的 process 數 (預設 CPU 核心數)")
+    p.add_argument("-s", "--shards", type=int, default=1,
+                   help="把每個檔案依 Item 邊界切成 N 段平行解析，適合少數幾個超大檔案 (檔案改為依序處理)")
+    p.add_argument("--cache", action="store_true", help="使用解析結果快取，內容沒變的檔案不再重新解析")
+    add_cache_arguments(p)
+    add_columns_argument(p)
+    add_rules_argument(p)
+    p.add_argument("--typed", action="store_true",
+                   help="數值欄位輸出成標準單位 (秒 / 伏特 / 安培) 的數字，無法轉換的原字串放在 <欄位>_raw")
+
+    p = sub.add_parser("tail", help="增量擷取仍在寫入中的 TXT 檔，只把新增的資料列接到輸出檔")
+    p.add_argument("input", help="TXT 檔")
+    p.add_argument("output", help="輸出檔 (.csv 或 .xlsx；.xlsx 每次整本重存，大檔建議用 .csv)，進度記錄在旁邊的 .tail.json")
+    p.add_argument("--final", action="store_true", help="檔案已寫完：輸出最後一個 Item 並刪除進度記錄")
+    add_columns_argument(p)
+    add_rules_argument(p)
+
+    p = sub.add_parser("diff", help="比對兩個 TXT 檔的擷取結果，只輸出新增、刪除與變更的部分")
+    p.add_argument("old", help="舊的 TXT 檔")
+    p.add_argument("new", help="新的 TXT 檔")
+    p.add_argument("output", help="差異輸出檔 (.csv 或 .xlsx)")
+    p.add_argument("-s", "--shards", type=int, default=1, help="把每個檔案切成 N 段平行解析")
+    add_columns_argument(p)
+    add_rules_argument(p)
+
+    p = sub.add_parser("rules", help="以規則表解析 TXT 檔，列出每條規則的命中次數與花費時間")
+    p.add_argument("inputs", nargs="+", help="TXT 檔、資料夾或萬用字元")
+    p.add_argument("-r", "--recursive", action="store_true", help="資料夾內包含子資料夾")
+    add_rules_argument(p)
+
+    p = sub.add_parser("cache", help="顯示或清除解析結果快取")
+    p.add_argument("--clear", action="store_true", help="刪除所有快取")
+    add_cache_arguments(p)
+
+    args = parser.parse_args(argv)
+    if args.command == "batch":
+        if (args.source_column or args.sheet_per_file) and not args.merge:
+            parser.error("--source-column / --sheet-per-file 需要搭配 --merge")
+        if args.sheet_per_file and Path(args.merge).suffix.lower() != ".xlsx":
+            parser.error("--sheet-per-file 只支援 .xlsx")
+        files = expand_inputs(args.inputs, args.recursive)
+        if not files:
+            print("找不到任何 TXT 檔案", file=sys.stderr)
+            return 2
+        cache = ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024) if args.cache else None
+        failed = run_batch(files, args.output_dir, args.format, args.merge, args.jobs, args.shards, cache,
+                           args.columns, args.typed, args.source_column, args.sheet_per_file, args.rules)
+        print(f"完成：成功 {len(files) - failed} 個，失敗 {failed} 個")
+        if cache is not None:
+            print(f"快取：命中 {cache.hits} 個，未命中 {cache.misses} 個")
+            cache.save_stats()
+        return 1 if failed else 0
+    if args.command == "tail":
+        count, restart = extract_tail(args.input, args.output, args.final, args.columns, args.rules)
+        print(f"{'從頭開始，' if restart else ''}新增 {count} 筆資料 -> {args.output}")
+        return 0
+    if args.command == "diff":
+        counts = diff_files(args.old, args.new, args.output, args.shards, args.columns, args.rules)
+        print(f"新增 {counts['added']} 列，刪除 {counts['removed']} 列，變更 {counts['changed']} 個欄位 -> {args.output}")
+        # 與 diff 指令相同：沒有差異回傳 0，有差異回傳 1
+        return 1 if any(counts.values()) else 0
+    if args.command == "rules":
+        files = expand_inputs(args.inputs, args.recursive)
+        rules = RuleSet([rule.spec for rule in (args.rules or DEFAULT_RULES).rules], profile=True)
+        rows = 0
+        start = time.perf_counter()
+        for filepath in files:
+            rows += sum(1 for _ in iter_extract_data(filepath, rules=rules))
+        print(f"{len(files)} 個檔案，{rows} 筆資料，{time.perf_counter() - start:.2f}s")
+        print(f"prefilter 直接略過 {rules.skipped} 行")
+        print(f"{'規則':<20}{'嘗試':>10}{'命中':>10}{'時間 (ms)':>12}{'us/次':>8}")
+        for stat in rules.stats():
+            per_try = stat["seconds"] / stat["tried"] * 1e6 if stat["tried"] else 0
+            print(f"{stat['name']:<20}{stat['tried']:>10}{stat['hits']:>10}{stat['seconds'] * 1000:>12.1f}{per_try:>8.2f}")
+        return 0
+    if args.command == "cache":
+        cache = ResultCache(args.cache_dir, args.cache_max_mb * 1024 * 1024)
+        if args.clear:
+            cache.clear()
+        stats = cache.stats()
+        print(f"快取資料夾：{cache.cache_dir}")
+        print(f"項目：{stats['entries']} 個，{stats['bytes'] / 1024 / 1024:.1f} / {stats['max_bytes'] / 1024 / 1024:.0f} MB")
+        print(f"累計命中 {stats['hits']} 次，未命中 {stats['misses']} 次 (命中率 {stats['hit_rate']:.0%})")
+    return 0
+
+def parse_columns(text):
+    columns = [c.strip() for c in text.split(",") if c.strip()]
+    try:
+        select_columns(columns)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return columns
+
+def add_columns_argument(parser):
+    parser.add_argument("-c", "--columns", type=parse_columns,
+                        help="只擷取並輸出這些欄位，以逗號分隔，例如 Vcc,T,I,Tspec (Item / Detail 一律保留)")
+
+def parse_rules(path):
+    try:
+        return load_rules(path)
+    except (OSError, ValueError) as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def add_rules_argument(parser):
+    parser.add_argument("--rules", type=parse_rules, metavar="FILE",
+                        help="Detail 行辨識規則的 JSON 設定檔 (預設使用內建規則)")
+
+def add_cache_arguments(parser):
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help=f"快取資料夾 (預設 {CACHE_DIR})")
+    parser.add_argument("--cache-max-mb", type=int, default=CACHE_MAX_BYTES // 1024 // 1024,
+                        help="快取大小上限 (MB)，超過時刪除最久沒用到的項目")
 
 if __name__ == "__main__":
-    set_macos_appearance()
-    app = MainApplication()
-    app.mainloop()
\ No newline at end of file
+    # 有帶參數時走命令列模式 (可在沒有螢幕的 Linux 上執行)
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    # 圖形介面需要 tkinter，只在開啟視窗時載入
+    from Rawdata_extract_gui import run_gui
+    run_gui()
@@ -0,0 +1,251 @@
+import argparse
+import os
+import sqlite3
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from Rawdata_extract import HEADERS, PARSER_VERSION, expand_inputs, extract_data, file_digest, row_values
+
+DEFAULT_DB = "rawdata_index.db"
+# 預設建立索引的參數欄位 (Item / Detail 一律有索引)
+DEFAULT_INDEX_COLUMNS = ["Vcc", "T", "I"]
+
+def quote(name):
+    # 欄位名稱含有 [ ] : (例如 OPT[31:0])，一律加上雙引號
+    return '"' + name.replace('"', '""') + '"'
+
+def parse_index_columns(text):
+    columns = [c.strip() for c in text.split(",") if c.strip()]
+    unknown = [c for c in columns if c not in HEADERS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"未知的欄位：{', '.join(unknown)}")
+    return columns
+
+class RawdataIndex:
+    """把 extract_data 的結果存進本機 SQLite，跨檔案查詢 Item / Detail / 參數
+
+    每個來源檔記錄大小、修改時間與 SHA-256；大小與修改時間沒變的檔案直接略過，
+    有變動但內容 hash 相同的只更新記錄，內容改變的才刪掉舊資料列重新載入。
+    """
+
+    def __init__(self, db_path=DEFAULT_DB):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.create_tables()
+
+    def close(self):
+        self.conn.close()
+
+    def create_tables(self):
+        columns = ", ".join(f"{quote(h)} TEXT" for h in HEADERS)
+        with self.conn:
+            self.conn.execute("""CREATE TABLE IF NOT EXISTS files (
+                id INTEGER PRIMARY KEY,
+                path TEXT UNIQUE NOT NULL,
+                sha256 TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                rows INTEGER NOT NULL,
+                parser_version TEXT NOT NULL,
+                loaded_at REAL NOT NULL)""")
+            self.conn.execute(f"CREATE TABLE IF NOT EXISTS rows (file_id INTEGER NOT NULL, seq INTEGER NOT NULL, {columns})")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_rows_file ON rows (file_id)")
+            self.create_indexes(["Item", "Detail"])
+
+    def create_indexes(self, columns):
+        with self.conn:
+            for column in columns:
+                name = "idx_rows_" + "".join(c if c.isalnum() else "_" for c in column)
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS {quote(name)} ON rows ({quote(column)})")
+
+    def indexed_columns(self):
+        columns = []
+        for (name,) in self.conn.execute("SELECT name FROM sqlite_master WHERE type='index' AND tbl_name='rows'"):
+            for (_, _, column) in self.conn.execute(f"PRAGMA index_info({quote(name)})"):
+                if column in HEADERS:
+                    columns.append(column)
+        return columns
+
+    def file_record(self, path):
+        return self.conn.execute(
+            "SELECT id, sha256, size, mtime_ns, parser_version FROM files WHERE path = ?", (path,)).fetchone()
+
+    def needs_load(self, path):
+        """回傳 (需要重新解析, sha256)；大小與修改時間都沒變時不計算 hash"""
+        st = os.stat(path)
+        record = self.file_record(path)
+        if record is not None and record[4] == PARSER_VERSION and (record[2], record[3]) == (st.st_size, st.st_mtime_ns):
+            return False, record[1]
+        digest = file_digest(path)
+        if record is not None and record[4] == PARSER_VERSION and record[1] == digest:
+            # 只是被 touch 過，內容沒變
+            with self.conn:
+                self.conn.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                                  (st.st_size, st.st_mtime_ns, record[0]))
+            return False, digest
+        return True, digest
+
+    def store(self, path, digest, rows):
+        """在同一個 transaction 裡取代一個來源檔的所有資料列；回傳筆數"""
+        st = os.stat(path)
+        placeholders = ", ".join("?" * (len(HEADERS) + 2))
+        with self.conn:
+            record = self.file_record(path)
+            if record is not None:
+                self.conn.execute("DELETE FROM rows WHERE file_id = ?", (record[0],))
+                self.conn.execute("DELETE FROM files WHERE id = ?", (record[0],))
+            file_id = self.conn.execute(
+                "INSERT INTO files (path, sha256, size, mtime_ns, rows, parser_version, loaded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (path, digest, st.st_size, st.st_mtime_ns, len(rows), PARSER_VERSION, time.time())).lastrowid
+            self.conn.executemany(
+                f"INSERT INTO rows VALUES ({placeholders})",
+                ([file_id, seq] + [value or None for value in row_values(row)] for seq, row in enumerate(rows)))
+        return len(rows)
+
+    def prune(self, keep=None):
+        """刪除來源檔已不存在 (或不在 keep 內) 的記錄；回傳刪除的檔案數"""
+        removed = 0
+        with self.conn:
+            for file_id, path in self.conn.execute("SELECT id, path FROM files").fetchall():
+                if (keep is not None and path not in keep) or not os.path.exists(path):
+                    self.conn.execute("DELETE FROM rows WHERE file_id = ?", (file_id,))
+                    self.conn.execute("DELETE FROM files WHERE id = ?", (file_id,))
+                    removed += 1
+        return removed
+
+    def load(self, files, jobs=None):
+        """增量載入 files；解析在 process pool 進行，寫入資料庫只在目前 process；回傳 (載入, 略過, 失敗)"""
+        loaded = skipped = failed = 0
+        todo = []
+        for path in files:
+            try:
+                changed, digest = self.needs_load(path)
+            except OSError as e:
+                print(f"FAIL {path}: {e}", file=sys.stderr)
+                failed += 1
+                continue
+            if changed:
+                todo.append((path, digest))
+            else:
+                skipped += 1
+
+        jobs = jobs or os.cpu_count() or 1
+        pool = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 and len(todo) > 1 else None
+        try:
+            # 最多 jobs * 2 個檔案在解析中，解析結果不會全部堆在記憶體裡
+            in_flight = deque()
+            pending = iter(todo)
+            while True:
+                while len(in_flight) < (jobs * 2 if pool else 1):
+                    item = next(pending, None)
+                    if item is None:
+                        break
+                    path, digest = item
+                    in_flight.append((path, digest, pool.submit(extract_data, path) if pool else None))
+                if not in_flight:
+                    break
+                path, digest, future = in_flight.popleft()
+                start = time.perf_counter()
+                try:
+                    rows = future.result() if future else extract_data(path)
+                    count = self.store(path, digest, rows)
+                except Exception as e:
+                    print(f"FAIL {path}: {e}", file=sys.stderr)
+                    failed += 1
+                    continue
+                print(f"OK   {path} ({count} 筆, {time.perf_counter() - start:.2f}s)")
+                loaded += 1
+        finally:
+            if pool is not None:
+                pool.shutdown()
+        return loaded, skipped, failed
+
+    def query(self, item=None, detail=None, where=None, columns=None, files_only=False, limit=None):
+        """依 Item / Detail / 參數值查詢；值含有 * 或 ? 時視為萬用字元 (GLOB)，否則為完全相同"""
+        conditions = []
+        params = []
+        for column, value in [("Item", item), ("Detail", detail)] + list(where or []):
+            if value is None:
+                continue
+            if any(c in value for c in "*?"):
+                conditions.append(f"r.{quote(column)} GLOB ?")
+            else:
+                conditions.append(f"r.{quote(column)} = ?")
+            params.append(value)
+        where_sql = " WHERE " + " AND ".join(conditions) if conditions else ""
+        if files_only:
+            sql = f"SELECT f.path, COUNT(*) FROM rows r JOIN files f ON f.id = r.file_id{where_sql} GROUP BY f.path ORDER BY f.path"
+        else:
+            selected = ["Item", "Detail"] + [c for c in columns or [] if c not in ("Item", "Detail")]
+            sql = (f"SELECT f.path, {', '.join('r.' + quote(c) for c in selected)} FROM rows r "
+                   f"JOIN files f ON f.id = r.file_id{where_sql} ORDER BY f.path, r.seq")
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+        return self.conn.execute(sql, params).fetchall()
+
+def parse_condition(text):
+    column, sep, value = text.partition("=")
+    if not sep or column not in HEADERS:
+        raise argparse.ArgumentTypeError(f"條件格式應為 欄位=值，例如 Vcc=3.3：{text}")
+    return column, value
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="把擷取結果載入 SQLite，跨檔案快速查詢")
+    parser.add_argument("--db", default=DEFAULT_DB, help=f"資料庫檔案 (預設 {DEFAULT_DB})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("load", help="增量載入 TXT 檔 (只重新解析有變動的檔案)")
+    p.add_argument("inputs", nargs="+", help="TXT 檔、資料夾或萬用字元")
+    p.add_argument("-r", "--recursive", action="store_true", help="資料夾內包含子資料夾")
+    p.add_argument("-j", "--jobs", type=int, help="同時解析的 process 數 (預設 CPU 核心數)")
+    p.add_argument("--index-columns", type=parse_index_columns, default=DEFAULT_INDEX_COLUMNS,
+                   help=f"要建立索引的參數欄位，以逗號分隔 (預設 {','.join(DEFAULT_INDEX_COLUMNS)})")
+    p.add_argument("--prune", action="store_true", help="刪除來源檔已不存在的記錄")
+
+    p = sub.add_parser("query", help="查詢符合條件的資料列或檔案")
+    p.add_argument("--item", help="Item 名稱 (可用 * ? 萬用字元)")
+    p.add_argument("--detail", help="Detail 名稱 (可用 * ? 萬用字元)")
+    p.add_argument("-w", "--where", type=parse_condition, action="append", default=[],
+                   help="參數條件，例如 -w Vcc=3.3 (可重複)")
+    p.add_argument("-c", "--columns", type=parse_index_columns, default=[], help="要顯示的參數欄位，以逗號分隔")
+    p.add_argument("--files", action="store_true", help="只列出符合的檔案 (lot) 與筆數")
+    p.add_argument("--limit", type=int, help="最多顯示幾筆")
+
+    sub.add_parser("stats", help="顯示資料庫內的檔案數、資料列數與索引欄位")
+
+    args = parser.parse_args(argv)
+    index = RawdataIndex(args.db)
+    try:
+        if args.command == "load":
+            files = expand_inputs(args.inputs, args.recursive)
+            if not files:
+                print("找不到任何 TXT 檔案", file=sys.stderr)
+                return 2
+            index.create_indexes(args.index_columns)
+            loaded, skipped, failed = index.load(files, args.jobs)
+            print(f"完成：載入 {loaded} 個，未變動略過 {skipped} 個，失敗 {failed} 個")
+            if args.prune:
+                print(f"刪除 {index.prune()} 個已不存在的檔案")
+            return 1 if failed else 0
+        if args.command == "query":
+            start = time.perf_counter()
+            results = index.query(args.item, args.detail, args.where, args.columns, args.files, args.limit)
+            for result in results:
+                print("\t".join("" if value is None else str(value) for value in result))
+            print(f"{len(results)} 筆，{(time.perf_counter() - start) * 1000:.1f} ms", file=sys.stderr)
+            return 0
+        files, rows = index.conn.execute("SELECT COUNT(*), COALESCE(SUM(rows), 0) FROM files").fetchone()
+        print(f"資料庫：{os.path.abspath(args.db)}")
+        print(f"檔案 {files} 個，資料列 {rows} 筆")
+        print(f"索引欄位：{', '.join(dict.fromkeys(index.indexed_columns()))}")
+        return 0
+    finally:
+        index.close()
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from Rawdata_extract import (CACHE_DIR, EXPORTERS, INPUT_PATTERNS, ResultCache, add_columns_argument,
+                             add_rules_argument, batch_extract_file, input_stem)
+
+STATE_FILE = ".watch_state.json"
+
+def log(message):
+    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {message}", flush=True)
+
+def file_signature(path):
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+class WatchService:
+    """監看資料夾，新增或變更的 TXT 檔在 quiet_period 秒內都沒有再變動後才排入解析
+
+    最多同時 workers 個 process 解析，等待中的檔案最多 queue_size 個；佇列滿時暫停收新檔，
+    這些檔案會在之後的掃描再被發現，所以一次湧入大量檔案也不會開出同樣多的 process。
+    """
+
+    def __init__(self, watch_dirs, output_dir, fmt="xlsx", quiet_period=30.0, interval=5.0,
+                 workers=None, queue_size=100, recursive=False, cache=None, columns=None, rules=None):
+        self.watch_dirs = [os.path.abspath(d) for d in watch_dirs]
+        self.output_dir = os.path.abspath(output_dir)
+        self.fmt = fmt
+        self.quiet_period = quiet_period
+        self.interval = interval
+        self.workers = workers or os.cpu_count() or 1
+        self.queue_size = queue_size
+        self.recursive = recursive
+        self.cache = cache
+        self.columns = columns
+        self.rules = rules
+
+        # path -> (signature, 最後一次看到 signature 改變的時間)
+        self.seen = {}
+        # path -> 已處理完成時的 signature
+        self.done = self.load_state()
+        self.pending = deque()
+        self.in_flight = {}
+        self.stopping = False
+
+    def state_path(self):
+        return os.path.join(self.output_dir, STATE_FILE)
+
+    def load_state(self):
+        try:
+            with open(self.state_path(), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def save_state(self):
+        with open(self.state_path() + ".tmp", 'w', encoding='utf-8') as f:
+            json.dump(self.done, f, ensure_ascii=False)
+        os.replace(self.state_path() + ".tmp", self.state_path())
+
+    def iter_files(self):
+        for watch_dir in self.watch_dirs:
+            for name in INPUT_PATTERNS:
+                for path in Path(watch_dir).glob("**/" + name if self.recursive else name):
+                    if path.is_file():
+                        yield watch_dir, str(path)
+
+    def output_path(self, watch_dir, path):
+        # 保留相對於監看資料夾的子資料夾結構，避免不同資料夾的同名檔互相覆蓋
+        relative = Path(path).relative_to(watch_dir).with_name(f"{input_stem(path)}.{self.fmt}")
+        if len(self.watch_dirs) > 1:
+            relative = Path(Path(watch_dir).name) / relative
+        return str(Path(self.output_dir) / relative)
+
+    def scan(self):
+        """找出已穩定且尚未處理過的檔案放進 pending；已刪除或改名的檔案不再追蹤"""
+        now = time.monotonic()
+        queued = {path for _, path, _ in self.pending} | set(self.in_flight)
+        found = set()
+        for watch_dir, path in self.iter_files():
+            try:
+                signature = file_signature(path)
+            except OSError:
+                continue
+            found.add(path)
+            previous = self.seen.get(path)
+            if previous is None or previous[0] != signature:
+                self.seen[path] = (signature, now)
+                continue
+            if now - previous[1] < self.quiet_period:
+                continue
+            if self.done.get(path) == signature or path in queued:
+                continue
+            if len(self.pending) >= self.queue_size:
+                # 佇列已滿，剩下的等下次掃描 (仍然記錄看到的檔案)
+                continue
+            self.pending.append((watch_dir, path, signature))
+            queued.add(path)
+
+        for path in set(self.seen) - found:
+            del self.seen[path]
+        self.pending = deque(item for item in self.pending if item[1] in found)
+        gone = [path for path in self.done if path not in found and path not in self.in_flight]
+        for path in gone:
+            del self.done[path]
+        if gone:
+            self.save_state()
+
+    def dispatch(self, pool):
+        while self.pending and len(self.in_flight) < self.workers:
+            watch_dir, path, signature = self.pending.popleft()
+            save_path = self.output_path(watch_dir, path)
+            os.makedirs(os.path.dirname(save_path), exist_ok=True)
+            future = pool.submit(batch_extract_file, path, save_path, 1, self.cache, self.columns, False, self.rules)
+            self.in_flight[path] = (future, save_path, signature)
+
+    def collect(self):
+        for path, (future, save_path, signature) in list(self.in_flight.items()):
+            if not future.done():
+                continue
+            del self.in_flight[path]
+            try:
+                count, hit, elapsed = future.result()
+            except Exception as e:
+                # 失敗的檔案也記錄下來，檔案沒再變動前不會一直重試
+                log(f"FAIL {path}: {e}")
+            else:
+                log(f"OK   {path} -> {save_path} ({count} 筆, {elapsed:.2f}s{', 快取' if hit else ''})")
+                if self.cache is not None:
+                    # worker process 裡 cache 的統計不會傳回來，改由這裡累計
+                    if hit:
+                        self.cache.hits += 1
+                    else:
+                        self.cache.misses += 1
+            self.done[path] = signature
+            self.save_state()
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def idle(self):
+        """沒有排隊或處理中的檔案，且仍存在的檔案都已處理過目前的版本"""
+        if self.pending or self.in_flight:
+            return False
+        return all(self.done.get(path) == signature for path, (signature, _) in self.seen.items()
+                   if os.path.exists(path))
+
+    def run(self, once=False):
+        """持續監看；once=True 時處理完目前所有檔案就結束"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        log(f"開始監看 {', '.join(self.watch_dirs)} (穩定 {self.quiet_period:g}s 後處理，{self.workers} 個 worker)")
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            while not self.stopping:
+                self.scan()
+                self.dispatch(pool)
+                self.collect()
+                if once and self.idle():
+                    break
+                time.sleep(self.interval)
+            # 等待進行中的檔案完成
+            for future, _, _ in list(self.in_flight.values()):
+                future.exception()
+            self.collect()
+        if self.cache is not None:
+            self.cache.save_stats()
+        log("停止監看")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="監看資料夾，自動擷取新進的 CP rawdata TXT 檔")
+    parser.add_argument("watch_dirs", nargs="+", help="要監看的資料夾")
+    parser.add_argument("-o", "--output-dir", required=True, help="輸出資料夾")
+    parser.add_argument("-f", "--format", default="xlsx", choices=[ext.lstrip(".") for ext in EXPORTERS])
+    parser.add_argument("-r", "--recursive", action="store_true", help="包含子資料夾")
+    parser.add_argument("-q", "--quiet-period", type=float, default=30.0,
+                        help="檔案大小與修改時間維持不變多少秒後才處理 (預設 30)")
+    parser.add_argument("-i", "--interval", type=float, default=5.0, help="掃描間隔秒數 (預設 5)")
+    parser.add_argument("-j", "--workers", type=int, help="同時解析的 process 數 (預設 CPU 核心數)")
+    parser.add_argument("--queue-size", type=int, default=100, help="等待處理的檔案上限 (預設 100)")
+    parser.add_argument("--cache", action="store_true", help="使用解析結果快取")
+    parser.add_argument("--once", action="store_true", help="處理完目前的檔案就結束 (適合排程執行)")
+    add_columns_argument(parser)
+    add_rules_argument(parser)
+
+    args = parser.parse_args(argv)
+    cache = ResultCache(CACHE_DIR) if args.cache else None
+    service = WatchService(args.watch_dirs, args.output_dir, args.format, args.quiet_period, args.interval,
+                           args.workers, args.queue_size, args.recursive, cache, args.columns, args.rules)
+    signal.signal(signal.SIGINT, service.stop)
+    signal.signal(signal.SIGTERM, service.stop)
+    service.run(args.once)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
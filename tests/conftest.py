@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 腳本都在專案根目錄，直接 import Rawdata_extract / MSS_transfer
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,113 @@
+"""MSS_transfer 串流讀取與 openpyxl load_workbook 結果的比對"""
+import zipfile
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.comments import Comment
+
+import MSS_transfer as M
+
+def openpyxl_comments(path, comment_col=7, start_row=3, header_row=1):
+    """原本的做法：load_workbook 後 compact_sheet，再從 start_row 往下讀到 A 欄空白"""
+    wb = load_workbook(path)
+    for sheet in wb.sheetnames:
+        ws = wb[sheet]
+        M.compact_sheet(ws, header_row=header_row)
+        row = start_row
+        while ws.cell(row=row, column=1).value:
+            comment = ws.cell(row=row, column=comment_col).comment
+            yield sheet, row, ws.cell(row=row, column=1).value, comment.text if comment else ''
+            row += 1
+
+def test_shared_formula_keys_match_openpyxl(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws['A1'] = 'Key'
+    for r in range(3, 10):
+        ws[f'A{r}'] = f'=B{r}*2+$C$1'
+        ws[f'B{r}'] = r
+        ws[f'G{r}'] = 'x'
+        ws[f'G{r}'].comment = Comment(f'Vcc=1 T={r}mS', 'test')
+    wb.save(tmp_path / 'plain.xlsx')
+
+    # 改成 Excel 存檔時的共用公式：第一格帶公式，其他格只有 si
+    path = tmp_path / 'shared.xlsx'
+    with zipfile.ZipFile(tmp_path / 'plain.xlsx') as zin, zipfile.ZipFile(path, 'w') as zout:
+        for info in zin.infolist():
+            data = zin.read(info)
+            if info.filename == 'xl/worksheets/sheet1.xml':
+                text = data.decode('utf-8').replace('<f>B3*2+$C$1</f>', '<f t="shared" ref="A3:A9" si="0">B3*2+$C$1</f>')
+                for r in range(4, 10):
+                    text = text.replace(f'<f>B{r}*2+$C$1</f>', '<f t="shared" si="0"/>')
+                data = text.encode('utf-8')
+            zout.writestr(info, data)
+
+    streamed = list(M.iter_sheet_comments(str(path)))
+    assert streamed == list(openpyxl_comments(str(path)))
+    assert streamed[0][2] == '=B4*2+$C$1'
+
+def test_xlsm_keeps_macros(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    ws['A1'] = 'Key'
+    ws['A2'] = 'unit'
+    ws['A3'] = 'k'
+    ws['G3'] = 'x'
+    ws['G3'].comment = Comment('Vcc=1', 'test')
+    wb.save(tmp_path / 'plain.xlsx')
+
+    # 加上 vbaProject.bin 並把主文件改成啟用巨集的格式
+    path = tmp_path / 'macro.xlsm'
+    with zipfile.ZipFile(tmp_path / 'plain.xlsx') as zin, zipfile.ZipFile(path, 'w') as zout:
+        for info in zin.infolist():
+            data = zin.read(info)
+            if info.filename == '[Content_Types].xml':
+                data = data.replace(b'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml',
+                                    b'application/vnd.ms-excel.sheet.macroEnabled.main+xml')
+                data = data.replace(b'</Types>', b'<Default Extension="bin" ContentType="application/vnd.ms-office.vbaProject"/></Types>')
+            zout.writestr(info, data)
+        zout.writestr('xl/vbaProject.bin', b'VBA')
+
+    save_path = tmp_path / 'out.xlsm'
+    assert M.extract_comments_all_sheets(str(path), save_path=str(save_path), verbose=False) == 1
+    with zipfile.ZipFile(save_path) as archive:
+        assert archive.read('xl/vbaProject.bin') == b'VBA'
+
+def sheet_snapshot(ws):
+    cells = sorted(
+        (cell.coordinate, type(cell).__name__, cell.value, cell.comment.text if cell.comment else None, cell.font.b)
+        for row in ws.iter_rows() for cell in row
+        if cell.value is not None or cell.comment is not None or cell.font.b)
+    return cells, sorted(str(r) for r in ws.merged_cells.ranges), ws.max_row, ws.max_column
+
+def test_compact_sheet_matches_delete_rows(tmp_path):
+    from openpyxl.styles import Font
+    wb = Workbook()
+    ws = wb.active
+    ws['A1'] = 'Key'
+    ws['H1'] = 'old title'
+    for r in range(2, 40):
+        if r % 3 == 0:
+            continue  # A 欄空白
+        ws[f'A{r}'] = f'k{r}' if r % 5 else f'=B{r}&"x"'
+        ws[f'B{r}'] = r
+        ws[f'C{r}'] = f'=SUM(B2:B{r})'
+        ws[f'G{r}'] = 'x'
+        ws[f'G{r}'].comment = Comment(f'Vcc={r}', 'test')
+        ws[f'I{r}'] = 'dropped'
+        ws[f'D{r}'].font = Font(bold=True)
+    ws['B9'].comment = Comment('blank row comment', 'test')
+    ws.merge_cells('D4:F4')
+    ws.merge_cells('B10:C11')
+    wb.save(tmp_path / 'in.xlsx')
+
+    fast = load_workbook(tmp_path / 'in.xlsx')
+    M.compact_sheet(fast.active)
+    slow = load_workbook(tmp_path / 'in.xlsx')
+    M.delete_blank_rows(slow.active)
+    assert sheet_snapshot(fast.active) == sheet_snapshot(slow.active)
+
+    # 存檔再讀回來也要一樣
+    fast.save(tmp_path / 'fast.xlsx')
+    slow.save(tmp_path / 'slow.xlsx')
+    assert sheet_snapshot(load_workbook(tmp_path / 'fast.xlsx').active) == \
+        sheet_snapshot(load_workbook(tmp_path / 'slow.xlsx').active)
@@ -0,0 +1,275 @@
+"""Rawdata_extract 與最初版本 extract_data 的等價測試 (隨機產生的 log、各種換行、切段、欄位投影、tail)"""
+import csv
+import random
+import re
+
+import pytest
+
+import Rawdata_extract as R
+
+# ---- 最初版本的 extract_data (逐行 re.match / re.search，作為正確答案) ----
+BASELINE_KEYWORDS = {k: k for k in R.HEADERS[2:]}
+
+def baseline_extract_data(filepath):
+    with open(filepath, 'r', encoding='utf-8') as f:
+        lines = f.readlines()
+
+    data = []
+    i = 0
+    while i < len(lines):
+        line = lines[i].strip()
+        match = re.match(r"#+\s*(.+?)\s*#+$", line)
+        if match:
+            base_item = match.group(1).strip()
+            next_item_index = i + 1
+            while next_item_index < len(lines):
+                if re.match(r"#+\s*(.+?)\s*#+$", lines[next_item_index]):
+                    break
+                next_item_index += 1
+
+            found = False
+            for j in range(i + 1, next_item_index):
+                detail_line = lines[j].strip().rstrip(".")
+                if (
+                    "(" in detail_line and ")" in detail_line
+                    and "(S)" not in detail_line
+                    and "[" not in detail_line
+                    and "]" not in detail_line
+                    and re.search(r"\([^\)]*?\)\s*$", detail_line)
+                ):
+                    row_data = {h: "" for h in R.HEADERS}
+                    row_data["Item"] = base_item
+                    row_data["Detail"] = re.sub(r"\([^\)]*\)\s*$", "", detail_line).strip()
+                    param_match = re.search(r"\(([^\)]*?)\)\s*$", detail_line)
+                    if param_match:
+                        all_kv_part = param_match.group(1)
+                        t_match = re.search(r"T=\s*([\d\.]+mS)", all_kv_part, re.IGNORECASE)
+                        if t_match:
+                            row_data["T"] = t_match.group(1)
+                        for k in BASELINE_KEYWORDS:
+                            kv_match = re.search(rf"{re.escape(k)}=([^;,\s\)]+)", all_kv_part)
+                            if kv_match:
+                                row_data[k] = kv_match.group(1)
+                    data.append(row_data)
+                    found = True
+                    break
+                elif re.search(r"\[.*?\].*?Measure Check\([^\)]+\)", detail_line):
+                    detail_part = re.sub(r"\(.*?\)\s*;.*", "", detail_line).strip()
+                    value_match = re.search(r"Measure Check\(([^)]+)\)", detail_line)
+                    if value_match:
+                        row_data = {h: "" for h in R.HEADERS}
+                        row_data["Item"] = base_item
+                        row_data["Detail"] = detail_part
+                        row_data["I"] = value_match.group(1).strip()
+                        data.append(row_data)
+                        found = True
+            if not found:
+                row_data = {h: "" for h in R.HEADERS}
+                row_data["Item"] = base_item
+                data.append(row_data)
+            i = next_item_index
+        else:
+            i += 1
+    return data
+
+# ---- 隨機 log 產生器 ----
+KEYS = ["Vcc", "Vhh", "ICC1", "ICC1_POR", "T", "t", "PST", "D", "VDD", "X", "X1", "OPT[31:0]", "I", "CS", "RC",
+        "SRC", "Tspec", "All", "UID1_d0", "Q"]
+VALUES = ["1.5mS", "3.3", "", " 2ms", "0x1F", "a=b", "5;", "-1"]
+
+def random_line(rnd):
+    r = rnd.random()
+    if r < 0.12:
+        return (rnd.choice(["", "  ", "\t"]) + "#" * rnd.randint(1, 8) + rnd.choice([" ", ""])
+                + rnd.choice(["Item A", "Item B", "x", "#"]) + rnd.choice([" ", ""]) + "#" * rnd.randint(1, 8)
+                + rnd.choice(["", "  "]))
+    if r < 0.45:
+        sep = rnd.choice([", ", "; ", ",", " "])
+        params = sep.join(f"{rnd.choice(KEYS)}={rnd.choice(VALUES)}" for _ in range(rnd.randint(0, 6)))
+        prefix = rnd.choice(["Detail", "Det (S) x", "Foo[1]", "Read", "  Write", " "])
+        return f"{prefix}({params}){rnd.choice(['', '  ', '.', '..', 'x'])}"
+    if r < 0.6:
+        return "%s[%d] Measure Check(%s); SPEC=%s%s" % (
+            rnd.choice(["Leak", "Ion", ""]), rnd.randint(0, 9), rnd.choice(["1.2uA", " 3 ", "", ")"]),
+            rnd.choice(["1", "2"]), rnd.choice(["", ".", "(x)"]))
+    if r < 0.65:
+        return "junk (a=1) [b]"
+    return rnd.choice(["random text", "PASS", "  ", "0.123 0.456", "　###中文###", "\x0c", "中文 (Vcc=5)", "é(T=1)"])
+
+def random_log(seed):
+    rnd = random.Random(seed)
+    # 每個檔案各自用 \n、\r\n 或 \r，也有混用的
+    ends = rnd.choice([["\n"], ["\r\n"], ["\r"], ["\n", "\r\n", "\r"]])
+    text = "".join(random_line(rnd) + rnd.choice(ends) for _ in range(rnd.randint(0, 300)))
+    if rnd.random() < 0.3:
+        text = text.rstrip("\r\n")
+    return text
+
+def write_log(path, text):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(text)
+    return str(path)
+
+@pytest.fixture(scope="module")
+def cases(tmp_path_factory):
+    folder = tmp_path_factory.mktemp("cases")
+    return [write_log(folder / f"c{seed:03d}.txt", random_log(seed)) for seed in range(200)]
+
+def as_dicts(rows):
+    return [row.to_dict() for row in rows]
+
+def test_extract_data_matches_baseline(cases):
+    for path in cases:
+        assert as_dicts(R.extract_data(path)) == baseline_extract_data(path), path
+
+def test_shards_match_baseline(cases):
+    for path in cases[:80]:
+        expected = baseline_extract_data(path)
+        for shards in (2, 5):
+            rows = []
+            for start, end in R.find_shard_ranges(path, shards, 1):
+                rows += R.parse_shard(path, start, end)
+            assert as_dicts(rows) == expected, (path, shards)
+        assert as_dicts(R.iter_extract_data(path, shards=4, min_shard_size=1)) == expected, path
+
+def test_column_projection_matches_full_parse(cases):
+    rnd = random.Random(1)
+    for path in cases:
+        columns = R.select_columns(rnd.sample(R.HEADERS[2:], rnd.randint(1, 8)))
+        full = [R.row_values(row, columns) for row in R.extract_data(path)]
+        projected = [R.row_values(row, columns) for row in R.extract_data(path, columns=columns)]
+        assert projected == full, path
+
+def test_tail_matches_baseline(cases, tmp_path):
+    rnd = random.Random(3)
+    live = tmp_path / "live.txt"
+    for n, path in enumerate(cases[:60]):
+        data = open(path, "rb").read()
+        out = str(tmp_path / f"out{n}.csv")
+        for cut in sorted(rnd.sample(range(len(data) + 1), min(5, len(data) + 1))) + [len(data)]:
+            live.write_bytes(data[:cut])
+            R.extract_tail(str(live), out)
+        R.extract_tail(str(live), out, final=True)
+        with open(out, encoding="utf-8-sig") as f:
+            got = list(csv.reader(f))[1:]
+        assert got == [[row[h] for h in R.HEADERS] for row in baseline_extract_data(path)], path
+
+def test_tail_xlsx_without_output_sheet(tmp_path):
+    from openpyxl import Workbook
+    log = write_log(tmp_path / "live.txt", "### A ###\nDetail(Vcc=1)\n### B ###\n")
+    out = str(tmp_path / "out.xlsx")
+    R.extract_tail(log, out)
+    wb = Workbook()
+    wb.active.title = "Other"
+    wb.save(out)
+    with pytest.raises(ValueError, match="Extracted Data"):
+        R.extract_tail(log, out, final=True)
+
+@pytest.mark.parametrize("value, unit, expected", [
+    ("1.5mS", "s", 1.5e-3),
+    ("1.5MS", "s", 1.5e-3),
+    ("1.5ms", "s", 1.5e-3),
+    ("1.2uA", "A", 1.2e-6),
+    ("3.3", "V", 3.3),
+    ("2kV", "V", None),
+    ("1.5GS", "s", None),
+    ("0x1F", "", 31.0),
+])
+def test_parse_number(value, unit, expected):
+    if expected is None:
+        assert R.parse_number(value, unit) is None
+    else:
+        assert R.parse_number(value, unit) == pytest.approx(expected)
+
+VT_RULES = [
+    {"name": "vt", "require": ["VT:"], "match": r"VT:\s*(\S+)", "value": r"VT:\s*(\S+)", "field": "Vcc",
+     "detail_strip": r"\s*VT:.*"},
+    {"name": "vt_any", "match": r"^Vt\s+(\S+)$", "value": r"^Vt\s+(\S+)$", "field": "Vcc", "detail_strip": r"\s+\S+$"},
+]
+
+@pytest.mark.parametrize("specs", [VT_RULES[:1], VT_RULES[:1] + R.DEFAULT_RULE_SPECS[:1],
+                                   VT_RULES])
+def test_rules_without_paren_reach_every_reader(tmp_path, specs):
+    import gzip
+    rules = R.RuleSet(specs)
+    text = "#### A ####\r\nProg VT: 3.3\nx\r#### B ####\nVt 1.2\n\nRead(Vcc=5)\n#### C ####\n" * 3
+    log = write_log(tmp_path / "vt.txt", text)
+    out = str(tmp_path / "vt.csv")
+    R.extract_tail(log, out, final=True, rules=rules)
+    with open(out, encoding="utf-8-sig") as f:
+        expected = list(csv.reader(f))[1:]
+    assert expected[0][:3] == ["A", "Prog", "3.3"]
+
+    def values(rows):
+        return [R.row_values(row) for row in rows]
+
+    assert values(R.extract_data(log, rules=rules)) == expected
+    assert values(R.iter_extract_data(log, shards=3, min_shard_size=1, rules=rules)) == expected
+    with gzip.open(tmp_path / "vt.txt.gz", "wb") as f:
+        f.write(text.encode("utf-8"))
+    assert values(R.extract_data(str(tmp_path / "vt.txt.gz"), rules=rules)) == expected
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_merge_skips_failed_file_entirely(tmp_path, jobs):
+    import gzip
+    from openpyxl import load_workbook
+    good = write_log(tmp_path / "good.txt", random_log(1))
+    other = write_log(tmp_path / "other.txt", random_log(2))
+    # 解壓到一半才發現檔案被截斷：前面的資料列已經解析出來了
+    text = "".join(f"### I{n} ###\nDetail(Vcc={n})\n" for n in range(20000))
+    data = gzip.compress(text.encode("utf-8"))
+    bad = tmp_path / "bad.txt.gz"
+    bad.write_bytes(data[:len(data) // 2])
+    files = [good, str(bad), other]
+
+    out = str(tmp_path / "merged.csv")
+    assert R.run_batch(files, merge=out, jobs=jobs) == 1
+    with open(out, encoding="utf-8-sig") as f:
+        got = list(csv.reader(f))[1:]
+    expected = baseline_extract_data(good) + baseline_extract_data(other)
+    assert got == [[row[h] for h in R.HEADERS] for row in expected]
+
+    out = str(tmp_path / "merged.xlsx")
+    assert R.run_batch(files, merge=out, jobs=jobs, sheet_per_file=True) == 1
+    assert load_workbook(out, read_only=True).sheetnames == ["good", "other"]
+
+@pytest.mark.parametrize("specs, message", [
+    ([{"builtin": "param_tail"}, "VT:"], "第 2 條規則.*JSON 物件"),
+    ([{"name": "vt", "match": "VT:", "field": "Vcc"}], "第 1 條規則.*field 但沒有 value"),
+    ([{"name": "vt", "match": "VT:", "require": "VT:"}], "第 1 條規則.*require"),
+    ([{"name": "vt", "match": ["VT:"]}], "第 1 條規則.*match"),
+    ([{"name": "vt", "match": "VT:", "colour": 1}], "第 1 條規則.*colour"),
+    ([{"builtin": ["param_tail"]}], "第 1 條規則.*沒有內建規則"),
+    ({"rules": [{"match": "VT:"}]}, "第 1 條規則.*name"),
+])
+def test_load_rules_rejects_bad_specs(tmp_path, specs, message):
+    import json
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(specs), encoding="utf-8")
+    with pytest.raises(ValueError, match=message):
+        R.load_rules(str(path))
+
+def test_params_group_that_matches_nothing(tmp_path):
+    rules = R.RuleSet([{"name": "opt", "require": ["Read"], "match": r"Read(?:\((.*)\))?$", "params": True}])
+    log = write_log(tmp_path / "opt.txt", "### A ###\nRead\n### B ###\nRead(Vcc=1)\n")
+    assert [R.row_values(row)[:3] for row in R.extract_data(log, rules=rules)] == [["A", "Read", ""], ["B", "Read(Vcc=1)", "1"]]
+
+def test_tail_offsets_with_invalid_utf8(tmp_path):
+    rnd = random.Random(5)
+    live = tmp_path / "live.txt"
+    for n in range(30):
+        data = bytearray(random_log(1000 + n).encode("utf-8"))
+        # 每個不合法的位元組解碼後變成 U+FFFD (3 bytes)，offset 不能因此偏掉
+        for _ in range(rnd.randint(1, 20)):
+            data[rnd.randrange(len(data) + 1):0] = rnd.choice([b"\xff", b"\xc3", b"\xe4\xb8", b"\x80\x80"])
+        data = bytes(data)
+        source = tmp_path / f"src{n}.txt"
+        source.write_bytes(data)
+        out = str(tmp_path / f"out{n}.csv")
+        for cut in sorted(rnd.sample(range(len(data) + 1), min(6, len(data) + 1))) + [len(data)]:
+            live.write_bytes(data[:cut])
+            R.extract_tail(str(live), out)
+        R.extract_tail(str(live), out, final=True)
+        with open(out, encoding="utf-8-sig") as f:
+            got = list(csv.reader(f))[1:]
+        assert got == [R.row_values(row) for row in R.extract_data(str(source))], n
@@ -0,0 +1,34 @@
+"""Rawdata_watch 的掃描與結束條件"""
+import threading
+
+import Rawdata_watch as W
+
+LOG = "### A ###\nDetail(Vcc=1)\n"
+
+def test_deleted_pending_file_does_not_block_once(tmp_path):
+    watch = tmp_path / "in"
+    watch.mkdir()
+    (watch / "a.txt").write_text(LOG, encoding="utf-8")
+    (watch / "b.txt").write_text(LOG, encoding="utf-8")
+    service = W.WatchService([str(watch)], str(tmp_path / "out"), fmt="csv", quiet_period=0, interval=0.01, workers=1)
+
+    # 第一次掃描只記錄，第二次放進 pending；處理前刪掉 a.txt
+    service.scan()
+    service.scan()
+    assert len(service.pending) == 2
+    (watch / "a.txt").unlink()
+    service.scan()
+    assert [path for _, path, _ in service.pending] == [str(watch / "b.txt")]
+    assert str(watch / "a.txt") not in service.seen
+
+    # 改名的檔案在處理前也消失，--once 仍要結束
+    (watch / "b.txt").rename(watch / "c.txt")
+    runner = threading.Thread(target=service.run, kwargs={"once": True}, daemon=True)
+    runner.start()
+    runner.join(timeout=30)
+    if runner.is_alive():
+        service.stop()
+        runner.join(timeout=30)
+        raise AssertionError("run(once=True) 沒有結束")
+    assert set(service.done) == {str(watch / "c.txt")}
+    assert (tmp_path / "out" / "c.csv").exists()